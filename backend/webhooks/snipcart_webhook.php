@@ -228,37 +228,152 @@ function formatAddress(array $address): string {
 }
 
 /**
- * Save order to local JSON file
+ * Append records to the order journal (data/orders.journal.jsonl)
+ *
+ * Same format and lock as bots/order_store.py: one JSON line per record,
+ * numbered after the last record already written, appended while holding
+ * data/orders.json.lock. The bots replay the journal on load and fold it
+ * into orders.json, keeping stats, statusCounts and activeOrderIds current.
  */
-function saveOrderLocally(array $order): void {
-    $ordersFile = __DIR__ . '/../../data/orders.json';
+function appendOrderJournal(array $records): void {
+    $dataDir = __DIR__ . '/../../data';
+    $journalFile = "$dataDir/orders.journal.jsonl";
+
+    $lock = fopen("$dataDir/orders.json.lock", 'a');
+    flock($lock, LOCK_EX);
+    try {
+        clearstatcache();
+        [$last, $end] = journalTail($journalFile);
+
+        // Drop a torn final line left by a crashed writer, as OrderStore does
+        if (file_exists($journalFile) && $end < filesize($journalFile)) {
+            $handle = fopen($journalFile, 'r+');
+            ftruncate($handle, $end);
+            fclose($handle);
+        }
+
+        // Continue from the last journaled record, or from the snapshot when the journal is empty
+        $seq = $last !== null ? (int) (json_decode($last, true)['seq'] ?? 0) : snapshotSeq("$dataDir/orders.json");
+
+        $out = '';
+        foreach ($records as $record) {
+            $record['seq'] = ++$seq;
+            $record['at'] = date('Y-m-d\TH:i:s');
+            $out .= json_encode($record, JSON_UNESCAPED_SLASHES) . "\n";
+        }
 
-    $orders = [];
-    if (file_exists($ordersFile)) {
-        $orders = json_decode(file_get_contents($ordersFile), true) ?: [];
+        $handle = fopen($journalFile, 'a');
+        fwrite($handle, $out);
+        fflush($handle);
+        if (function_exists('fsync')) {
+            fsync($handle);
+        }
+        fclose($handle);
+    } finally {
+        flock($lock, LOCK_UN);
+        fclose($lock);
     }
+}
 
-    // Add to orders list
-    $orders['orders'][] = [
-        'id' => $order['order_id'],
-        'date' => $order['date'],
-        'customer' => $order['customer_name'],
-        'email' => $order['customer_email'],
-        'product' => $order['items'][0]['name'] ?? 'Multiple Items',
-        'quantity' => array_sum(array_column($order['items'], 'quantity')),
-        'total' => $order['total'],
-        'status' => $order['status']
-    ];
+/**
+ * Last complete journal line and the offset just past it ([null, 0] when empty)
+ *
+ * Reads backwards from the end in growing chunks, so finding the last
+ * record does not depend on how many records the journal holds.
+ */
+function journalTail(string $journalFile): array {
+    $size = file_exists($journalFile) ? filesize($journalFile) : 0;
+    if (!$size) return [null, 0];
+
+    $handle = fopen($journalFile, 'rb');
+    try {
+        for ($chunk = 8192; ; $chunk *= 4) {
+            $start = max(0, $size - $chunk);
+            fseek($handle, $start);
+            $tail = (string) fread($handle, $size - $start);
+
+            // The last newline ends the last complete record; anything after it is torn
+            $end = strrpos($tail, "\n");
+            if ($end === false) {
+                if ($start === 0) return [null, 0];
+                continue;
+            }
+            $prev = strrpos(substr($tail, 0, $end), "\n");
+            if ($prev !== false || $start === 0) {
+                $from = $prev === false ? 0 : $prev + 1;
+                return [substr($tail, $from, $end - $from), $start + $end + 1];
+            }
+        }
+    } finally {
+        fclose($handle);
+    }
+}
 
-    // Update stats
-    if (!isset($orders['stats'])) {
-        $orders['stats'] = ['revenue' => 0, 'orders_count' => 0];
+/**
+ * journalSeq of the orders.json snapshot
+ *
+ * OrderStore writes journalSeq as the snapshot's last key, so only the
+ * end of the file is read. Snapshots written before that are parsed whole.
+ */
+function snapshotSeq(string $snapshotFile): int {
+    if (!file_exists($snapshotFile)) return 0;
+
+    $size = filesize($snapshotFile);
+    $handle = fopen($snapshotFile, 'rb');
+    fseek($handle, max(0, $size - 4096));
+    $tail = (string) fread($handle, 4096);
+    fclose($handle);
+    if (preg_match('/"journalSeq"\s*:\s*(\d+)\s*}\s*$/', $tail, $m)) {
+        return (int) $m[1];
     }
-    $orders['stats']['revenue'] += $order['total'];
-    $orders['stats']['orders_count']++;
-    $orders['stats']['last_order'] = $order['date'];
 
-    file_put_contents($ordersFile, json_encode($orders, JSON_PRETTY_PRINT));
+    $snapshot = @json_decode((string) @file_get_contents($snapshotFile), true);
+    return (int) ($snapshot['journalSeq'] ?? 0);
+}
+
+/**
+ * Snipcart order status -> the status name bots/order_store.py tracks
+ *
+ * Open statuses must match OPEN_STATUSES there, or the order drops out of
+ * the active index hourly fulfillment works from.
+ */
+function storeStatus(string $status): string {
+    $map = [
+        'inprogress' => 'processing',
+        'processed' => 'processing',
+        'pending' => 'pending',
+        'dispatched' => 'shipped',
+        'shipped' => 'shipped',
+        'delivered' => 'delivered',
+        'cancelled' => 'cancelled',
+        'refunded' => 'refunded'
+    ];
+    $status = strtolower($status);
+    return $map[$status] ?? $status;
+}
+
+/**
+ * Save order to the local order journal
+ */
+function saveOrderLocally(array $order): void {
+    // Canonical order record (bots/order_schema.py, "v": 1)
+    appendOrderJournal([[
+        'op' => 'add',
+        'order' => [
+            'v' => 1,
+            'id' => $order['order_id'],
+            'created_at' => str_replace(' ', 'T', $order['date']),
+            'status' => $order['status'],
+            'product' => $order['items'][0]['name'] ?? 'Multiple Items',
+            'quantity' => array_sum(array_column($order['items'], 'quantity')) ?: 1,
+            'total' => (float) $order['total'],
+            'customer_name' => $order['customer_name'],
+            'customer_email' => $order['customer_email'],
+            'customer_phone' => $order['phone'] ?: null,
+            'items' => $order['items'],
+            'payment_method' => $order['payment_method']
+        ]
+    ]]);
 }
 
 /**
@@ -462,23 +577,18 @@ function sendShippingNotification(array $order): void {
 
 /**
  * Update order status in local storage
+ *
+ * Journaled like new orders, so it reaches orders still waiting in the
+ * journal as well as those already in orders.json.
  */
 function updateOrderStatus(string $orderId, string $status): void {
-    $ordersFile = __DIR__ . '/../../data/orders.json';
-
-    if (!file_exists($ordersFile)) return;
-
-    $orders = json_decode(file_get_contents($ordersFile), true) ?: [];
-
-    foreach ($orders['orders'] as &$order) {
-        if ($order['id'] === $orderId) {
-            $order['status'] = $status;
-            $order['updated_at'] = date('Y-m-d H:i:s');
-            break;
-        }
-    }
+    if ($orderId === '') return;
 
-    file_put_contents($ordersFile, json_encode($orders, JSON_PRETTY_PRINT));
+    appendOrderJournal([[
+        'op' => 'update',
+        'id' => $orderId,
+        'fields' => ['status' => storeStatus($status), 'updated_at' => date('Y-m-d\TH:i:s')]
+    ]]);
 }
 
 /**
@@ -2,23 +2,65 @@
 """
 SellBuddy Analytics Dashboard
 Generates visual analytics dashboard with revenue, profit, and performance metrics.
+
+Usage:
+    python analytics_dashboard.py                          # From the order repository
+    python analytics_dashboard.py --source export.csv      # Stream order files in one pass
+    python analytics_dashboard.py --cohort-months 0        # Cohorts from the full order history
 """
 
 import json
+import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
 import random
-
-def load_orders():
-    """Load orders from JSON file or return sample data."""
-    orders_path = Path(__file__).parent.parent / "data" / "orders.json"
-    try:
-        with open(orders_path, "r") as f:
-            data = json.load(f)
-            return data.get("orders", [])
-    except:
-        # Return sample data for demo
-        return generate_sample_data()
+from itertools import chain
+
+from order_frame import OrderFrame
+from order_metrics import MetricsAggregator, stream_orders
+from quantile_sketch import KLLSketch
+from top_k import top_k
+from order_timeseries import SeriesBuilder, build_series, series_from_rollups
+from order_schema import Order
+from order_store import OrderStore
+from order_archive import load_orders as load_partitioned_orders
+from order_cohorts import cohort_analysis, month_index, month_label
+from data_access import write_text_if_changed
+from html_templates import render
+from order_repository import open_repository
+
+def load_orders(start=None, end=None):
+    """Load orders created in [start, end] or return sample data."""
+    data_dir = Path(__file__).parent.parent / "data"
+    store = OrderStore(data_dir)
+    if store.snapshot_file.exists() or store.journal_file.exists():
+        return list(load_partitioned_orders(data_dir, start, end, store))
+
+    # Return sample data for demo
+    return generate_sample_data()
+
+
+def load_repository():
+    """Open the indexed order repository, or None when there is no order data yet."""
+    data_dir = Path(__file__).parent.parent / "data"
+    store = OrderStore(data_dir)
+    if store.snapshot_file.exists() or store.journal_file.exists():
+        return open_repository(data_dir, store)
+    return None
+
+
+def load_cohorts(months=24):
+    """Cohort matrix of orders from the last months calendar months (0: the whole history).
+
+    Archive partitions before the first month are not read; customers
+    whose first order is older count as new in the month they return.
+    """
+    data_dir = Path(__file__).parent.parent / "data"
+    store = OrderStore(data_dir)
+    start = None
+    if months:
+        start = month_label(month_index(datetime.now().date().isoformat()) - months + 1) + "-01"
+    return cohort_analysis(lambda: load_partitioned_orders(data_dir, start, None, store))
 
 
 def generate_sample_data():
@@ -31,31 +73,34 @@ def generate_sample_data():
         {"name": "Portable Blender", "price": 24.99, "cost": 8.00},
     ]
 
+    customers = [f"customer{n}@example.com" for n in range(12)]
+
     orders = []
     today = datetime.now()
 
     for i in range(30):
-        date = today - timedelta(days=random.randint(0, 30))
+        date = today - timedelta(days=random.randint(0, 90))
         product = random.choice(products)
         quantity = random.randint(1, 3)
 
-        orders.append({
-            "id": f"SB-{1000 + i}",
-            "date": date.strftime("%Y-%m-%d"),
-            "product": product["name"],
-            "quantity": quantity,
-            "revenue": round(product["price"] * quantity, 2),
-            "cost": round(product["cost"] * quantity, 2),
-            "profit": round((product["price"] - product["cost"]) * quantity, 2),
-            "status": random.choice(["delivered", "shipped", "processing", "pending"])
-        })
+        orders.append(Order(
+            id=f"SB-{1000 + i}",
+            created_at=date.strftime("%Y-%m-%d"),
+            product=product["name"],
+            quantity=quantity,
+            total=round(product["price"] * quantity, 2),
+            cost=round(product["cost"] * quantity, 2),
+            status=random.choice(["delivered", "shipped", "processing", "pending"]),
+            customer_email=random.choice(customers)
+        ))
 
     return orders
 
 
 def calculate_metrics(orders):
-    """Calculate key business metrics."""
-    if not orders:
+    """Calculate key business metrics from Orders or an OrderFrame."""
+    frame = orders if isinstance(orders, OrderFrame) else OrderFrame.from_orders(orders)
+    if not len(frame):
         return {
             "total_orders": 0,
             "total_revenue": 0,
@@ -67,56 +112,98 @@ def calculate_metrics(orders):
             "daily_revenue": []
         }
 
-    total_revenue = sum(o["revenue"] for o in orders)
-    total_cost = sum(o["cost"] for o in orders)
-    total_profit = sum(o["profit"] for o in orders)
+    total_revenue = frame.sum("revenue")
+    total_profit = frame.sum("profit")
 
     # Status breakdown
-    status_counts = {}
-    for o in orders:
-        status = o["status"]
-        status_counts[status] = status_counts.get(status, 0) + 1
+    status_counts = frame.group_sum("status")
 
     # Top products
-    product_sales = {}
-    for o in orders:
-        product = o["product"]
-        if product not in product_sales:
-            product_sales[product] = {"units": 0, "revenue": 0}
-        product_sales[product]["units"] += o["quantity"]
-        product_sales[product]["revenue"] += o["revenue"]
-
-    top_products = sorted(
-        [{"name": k, **v} for k, v in product_sales.items()],
-        key=lambda x: x["revenue"],
-        reverse=True
-    )[:5]
+    units = frame.group_sum("product", "quantity")
+    revenue = frame.group_sum("product", "revenue")
+    top_products = top_k(
+        ({"name": k, "units": units[k], "revenue": round(v, 2)} for k, v in revenue.items()),
+        5, key=lambda x: x["revenue"]
+    )
 
     # Daily revenue (last 7 days)
     today = datetime.now()
-    daily = {}
-    for i in range(7):
-        day = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-        daily[day] = 0
+    days = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(6, -1, -1)]
+    recent = frame.filter(frame.between(days[0], days[-1]))
+    daily = recent.group_sum("day", "revenue")
 
-    for o in orders:
-        if o["date"] in daily:
-            daily[o["date"]] += o["revenue"]
+    daily_revenue = [{"date": d, "revenue": round(daily.get(d, 0), 2)} for d in days]
 
-    daily_revenue = [{"date": k, "revenue": round(v, 2)} for k, v in sorted(daily.items())]
+    # Order value and margin distributions
+    values, margins = KLLSketch(), KLLSketch()
+    for revenue, margin in zip(frame.columns["revenue"], frame.columns["margin"]):
+        values.update(float(revenue))
+        if margin == margin:  # NaN: margin_pct() had no cost to work from
+            margins.update(float(margin))
 
     return {
-        "total_orders": len(orders),
+        "total_orders": len(frame),
         "total_revenue": round(total_revenue, 2),
         "total_profit": round(total_profit, 2),
-        "avg_order_value": round(total_revenue / len(orders), 2) if orders else 0,
+        "avg_order_value": round(total_revenue / len(frame), 2),
         "profit_margin": round((total_profit / total_revenue) * 100, 1) if total_revenue > 0 else 0,
         "orders_by_status": status_counts,
         "top_products": top_products,
-        "daily_revenue": daily_revenue
+        "daily_revenue": daily_revenue,
+        "order_value_pctl": values.quantiles(),
+        "margin_pctl": margins.quantiles()
+    }
+
+
+def query_metrics(repo):
+    """Calculate key business metrics with indexed repository queries."""
+    totals = repo.totals()
+    total_orders = totals["orders"]
+    total_revenue = totals["revenue"]
+    total_profit = totals["profit"]
+
+    # Daily revenue (last 7 days)
+    today = datetime.now()
+    days = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(6, -1, -1)]
+    daily = repo.daily_revenue(days[0], days[-1])
+
+    return {
+        "total_orders": total_orders,
+        "total_revenue": total_revenue,
+        "total_profit": total_profit,
+        "avg_order_value": round(total_revenue / total_orders, 2) if total_orders else 0,
+        "profit_margin": round((total_profit / total_revenue) * 100, 1) if total_revenue > 0 else 0,
+        "orders_by_status": repo.status_counts(),
+        "top_products": repo.product_sales(5),
+        "daily_revenue": [{"date": d, "revenue": daily.get(d, 0)} for d in days],
+        "order_value_pctl": repo.quantiles("value"),
+        "margin_pctl": repo.quantiles("margin")
     }
 
 
+# Dashboard tabs, in days; longer windows chart weekly buckets
+WINDOWS = (7, 30, 90, 365)
+
+
+def window_start(now=None):
+    """First day window_metrics() reads: the longest window and the period before it."""
+    return ((now or datetime.now()) - timedelta(days=2 * max(WINDOWS))).date().isoformat()
+
+
+def window_metrics(series):
+    """Totals, change vs the previous period and a chart series for each window."""
+    day, week = series["day"], series["week"]
+    windows = {}
+    for days in WINDOWS:
+        result = day.compare(*day.last(days))
+        chart = week if days > 90 else day
+        points = chart.series(*chart.last(days // 7 if chart is week else days))
+        result["labels"] = [when.strftime("%m-%d") for when, _ in points]
+        result["values"] = [value for _, value in points]
+        windows[str(days)] = result
+    return windows
+
+
 def generate_dashboard_html(metrics):
     """Generate HTML dashboard."""
     today = datetime.now().strftime("%B %d, %Y")
@@ -133,6 +220,26 @@ def generate_dashboard_html(metrics):
         color = status_colors.get(status, "#6b7280")
         status_html += f'<div class="status-badge" style="background: {color}20; color: {color};">{status.title()}: {count}</div>'
 
+    # Percentile cards, when the metrics carry distributions
+    def pctl(values, fmt):
+        return " / ".join(fmt.format(v) if v is not None else "-" for v in values.values())
+
+    pctl_html = ""
+    if metrics.get("order_value_pctl"):
+        pctl_html += f"""
+            <div class="metric-card">
+                <h3>ORDER VALUE P50 / P90 / P99</h3>
+                <div class="value small">{pctl(metrics['order_value_pctl'], '${:.2f}')}</div>
+                <div class="subtext">Distribution, not just the average</div>
+            </div>"""
+    if metrics.get("margin_pctl"):
+        pctl_html += f"""
+            <div class="metric-card">
+                <h3>MARGIN P50 / P90 / P99</h3>
+                <div class="value small">{pctl(metrics['margin_pctl'], '{:.1f}%')}</div>
+                <div class="subtext">Per-order margin</div>
+            </div>"""
+
     # Top products HTML
     products_html = ""
     for p in metrics["top_products"]:
@@ -144,176 +251,57 @@ def generate_dashboard_html(metrics):
         </tr>
         """
 
-    # Chart data for daily revenue
-    chart_labels = [d["date"][-5:] for d in metrics["daily_revenue"]]
-    chart_values = [d["revenue"] for d in metrics["daily_revenue"]]
-
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>SellBuddy - Analytics Dashboard</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Segoe UI', sans-serif; background: #f5f5f5; padding: 20px; }}
-        .container {{ max-width: 1200px; margin: 0 auto; }}
-
-        header {{
-            background: linear-gradient(135deg, #6366f1, #4f46e5);
-            color: white;
-            padding: 30px;
-            border-radius: 12px;
-            margin-bottom: 30px;
-        }}
-        header h1 {{ margin-bottom: 10px; }}
-
-        .metrics-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-
-        .metric-card {{
-            background: white;
-            padding: 25px;
-            border-radius: 12px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .metric-card h3 {{ color: #6b7280; font-size: 14px; margin-bottom: 10px; }}
-        .metric-card .value {{ font-size: 32px; font-weight: 700; color: #1f2937; }}
-        .metric-card .positive {{ color: #10b981; }}
-        .metric-card .subtext {{ font-size: 12px; color: #6b7280; margin-top: 5px; }}
-
-        .card {{
-            background: white;
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .card h2 {{ color: #1f2937; margin-bottom: 20px; }}
-
-        table {{ width: 100%; border-collapse: collapse; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #e5e7eb; }}
-        th {{ background: #f9fafb; font-weight: 600; }}
-
-        .status-badges {{ display: flex; gap: 10px; flex-wrap: wrap; margin-bottom: 20px; }}
-        .status-badge {{ padding: 8px 16px; border-radius: 20px; font-weight: 600; font-size: 14px; }}
-
-        .chart-container {{ height: 300px; }}
-
-        .two-col {{ display: grid; grid-template-columns: 1fr 1fr; gap: 25px; }}
-        @media (max-width: 768px) {{ .two-col {{ grid-template-columns: 1fr; }} }}
-
-        footer {{ text-align: center; color: #6b7280; margin-top: 30px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>Analytics Dashboard</h1>
-            <p>Updated: {today} | SellBuddy Store Performance</p>
-        </header>
-
-        <div class="metrics-grid">
-            <div class="metric-card">
-                <h3>TOTAL ORDERS</h3>
-                <div class="value">{metrics['total_orders']}</div>
-                <div class="subtext">All time</div>
-            </div>
-            <div class="metric-card">
-                <h3>TOTAL REVENUE</h3>
-                <div class="value positive">${metrics['total_revenue']:,.2f}</div>
-                <div class="subtext">Gross sales</div>
-            </div>
-            <div class="metric-card">
-                <h3>TOTAL PROFIT</h3>
-                <div class="value positive">${metrics['total_profit']:,.2f}</div>
-                <div class="subtext">After costs</div>
-            </div>
-            <div class="metric-card">
-                <h3>AVG ORDER VALUE</h3>
-                <div class="value">${metrics['avg_order_value']:.2f}</div>
-                <div class="subtext">Per order</div>
-            </div>
-            <div class="metric-card">
-                <h3>PROFIT MARGIN</h3>
-                <div class="value positive">{metrics['profit_margin']}%</div>
-                <div class="subtext">Net margin</div>
-            </div>
-        </div>
-
+    # Cohort matrix: retention by months since the first order, then LTV
+    cohort_html = ""
+    cohorts = metrics.get("cohorts")
+    if cohorts and cohorts["cohorts"]:
+        months = cohorts["months"]
+        head = "".join(f"<th>M{i}</th>" for i in range(months))
+        rows = ""
+        for c in cohorts["cohorts"]:
+            cells = "".join(f"<td>{r:g}%</td>" for r in c["retention"])
+            rows += f"<tr><td>{c['cohort']}</td><td>{c['customers']}</td>{cells}<td>${c['ltv'][-1]:.2f}</td></tr>"
+        cohort_html = f"""
         <div class="card">
-            <h2>Order Status</h2>
-            <div class="status-badges">
-                {status_html}
-            </div>
-        </div>
-
-        <div class="two-col">
-            <div class="card">
-                <h2>Revenue (Last 7 Days)</h2>
-                <div class="chart-container">
-                    <canvas id="revenueChart"></canvas>
-                </div>
+            <h2>Customer Cohorts</h2>
+            <div class="window-stats">
+                <span>Customers: <strong>{cohorts['customers']}</strong></span>
+                <span>Repeat rate: <strong>{cohorts['repeat_rate']}%</strong></span>
             </div>
-
-            <div class="card">
-                <h2>Top Products</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Product</th>
-                            <th>Units</th>
-                            <th>Revenue</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {products_html}
-                    </tbody>
+            <div class="table-scroll">
+                <table class="cohorts">
+                    <thead><tr><th>Cohort</th><th>Size</th>{head}<th>LTV</th></tr></thead>
+                    <tbody>{rows}</tbody>
                 </table>
             </div>
         </div>
+"""
 
-        <footer>
-            <p>SellBuddy Analytics Dashboard v1.0 | Auto-refreshes daily</p>
-        </footer>
-    </div>
-
-    <script>
-        const ctx = document.getElementById('revenueChart').getContext('2d');
-        new Chart(ctx, {{
-            type: 'line',
-            data: {{
-                labels: {chart_labels},
-                datasets: [{{
-                    label: 'Revenue ($)',
-                    data: {chart_values},
-                    borderColor: '#6366f1',
-                    backgroundColor: 'rgba(99, 102, 241, 0.1)',
-                    fill: true,
-                    tension: 0.4
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    legend: {{ display: false }}
-                }},
-                scales: {{
-                    y: {{ beginAtZero: true }}
-                }}
-            }}
-        }});
-    </script>
-</body>
-</html>"""
-
-    return html
+    # Window tabs; without a time series there is just the 7-day chart
+    windows = metrics.get("windows") or {"7": {
+        "labels": [d["date"][-5:] for d in metrics["daily_revenue"]],
+        "values": [d["revenue"] for d in metrics["daily_revenue"]],
+    }}
+    tabs_html = "".join(
+        f'<button class="tab{" active" if i == 0 else ""}" data-window="{days}">{days}D</button>'
+        for i, days in enumerate(windows)
+    )
+
+    return render(
+        "dashboard",
+        today=today,
+        total_orders=metrics["total_orders"],
+        total_revenue=f"{metrics['total_revenue']:,.2f}",
+        total_profit=f"{metrics['total_profit']:,.2f}",
+        avg_order_value=f"{metrics['avg_order_value']:.2f}",
+        profit_margin=metrics["profit_margin"],
+        pctl_html=pctl_html,
+        status_html=status_html,
+        tabs_html=tabs_html,
+        products_html=products_html,
+        cohort_html=cohort_html,
+        windows_json=json.dumps(windows),
+    )
 
 
 def save_dashboard(html_content):
@@ -322,15 +310,23 @@ def save_dashboard(html_content):
     reports_dir.mkdir(exist_ok=True)
 
     dashboard_path = reports_dir / "dashboard.html"
-    with open(dashboard_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
-
-    print(f"Dashboard saved to: {dashboard_path}")
+    if write_text_if_changed(dashboard_path, html_content):
+        print(f"Dashboard saved to: {dashboard_path}")
+    else:
+        print(f"Dashboard unchanged: {dashboard_path}")
     return str(dashboard_path)
 
 
 def main():
     """Main function to generate analytics dashboard."""
+    parser = argparse.ArgumentParser(description='Generate the SellBuddy analytics dashboard')
+    parser.add_argument('--source', '-s', action='append',
+                        help='Order .jsonl or .csv file to stream instead of the repository (repeatable)')
+    parser.add_argument('--cohort-months', type=int, default=24,
+                        help='Months of order history to build cohorts from (0 for all)')
+
+    args = parser.parse_args()
+
     print("=" * 50)
     print("SellBuddy Analytics Dashboard")
     print("=" * 50)
@@ -338,12 +334,37 @@ def main():
 
     # Load orders
     print("Loading order data...")
-    orders = load_orders()
-    print(f"Found {len(orders)} orders")
-
-    # Calculate metrics
-    print("Calculating metrics...")
-    metrics = calculate_metrics(orders)
+    repo = None if args.source else load_repository()
+    if args.source:
+        # One pass over the files, holding only running totals
+        agg = MetricsAggregator()
+        series = SeriesBuilder()
+        for path in args.source:
+            for order in stream_orders(path):
+                agg.add(order)
+                series.add_order(order)
+        print(f"Found {agg.orders} orders")
+        metrics = agg.metrics()
+        metrics["windows"] = window_metrics(series.build())
+        metrics["cohorts"] = cohort_analysis(lambda: chain.from_iterable(stream_orders(p) for p in args.source))
+    elif repo:
+        print(f"Found {repo.count()} orders")
+
+        # Calculate metrics
+        print("Calculating metrics...")
+        metrics = query_metrics(repo)
+        metrics["windows"] = window_metrics(series_from_rollups(repo.rollups(start=window_start())))
+        repo.close()
+        metrics["cohorts"] = load_cohorts(args.cohort_months)
+    else:
+        orders = generate_sample_data()
+        print(f"Found {len(orders)} orders")
+
+        # Calculate metrics
+        print("Calculating metrics...")
+        metrics = calculate_metrics(orders)
+        metrics["windows"] = window_metrics(build_series(orders))
+        metrics["cohorts"] = cohort_analysis(lambda: orders)
 
     # Print summary
     print("\nKEY METRICS:")
@@ -362,6 +383,10 @@ def main():
     for p in metrics["top_products"][:3]:
         print(f"  {p['name']}: {p['units']} units (${p['revenue']:.2f})")
 
+    cohorts = metrics["cohorts"]
+    print(f"\nCUSTOMERS: {cohorts['customers']} ({cohorts['repeat_rate']}% repeat, "
+          f"{len(cohorts['cohorts'])} monthly cohorts)")
+
     # Generate and save dashboard
     print("\nGenerating HTML dashboard...")
     html = generate_dashboard_html(metrics)
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Analytics Query
+Ad-hoc filters, group-bys and aggregations over orders, products, content and reports.
+
+Every question goes through one planner. It looks at the source, the
+predicates, the group-by fields and the aggregates, and picks the cheapest
+access path that can answer them:
+
+- orders: the daily_rollups table when the query only touches day, product
+  and status; otherwise the orders table in data/orders.db, with day ranges
+  rewritten onto the created_at index. --scan reads the monthly archive
+  partitions instead, opening only those whose dates overlap the day range.
+- reports / research: the metrics and research_products tables of the
+  report index (data/reports.db).
+- content: content_<date>.json files, skipping those outside the date range.
+- products: the catalog in data/products.json.
+
+Predicates that cannot be pushed into SQL or used for pruning are applied
+to each row as it streams past. Nothing is loaded into memory beyond the
+rows of a single partition file and the group-by accumulators.
+
+Usage:
+    python analytics_query.py orders --agg count --agg sum:total --group-by status
+    python analytics_query.py orders --where "day>=2026-08-01" --where status=shipped --group-by product --agg sum:total
+    python analytics_query.py orders --where "customer_email~@gmail" --fields id,total --limit 5
+    python analytics_query.py reports --where metric=orders.revenue --where "date>=2026-01-01" --agg avg:value
+    python analytics_query.py content --group-by type --agg count --explain
+    python analytics_query.py products --where "tags~viral" --fields name,price --order-by=-price
+"""
+
+import re
+import sys
+import json
+import time
+import sqlite3
+import operator
+import argparse
+from itertools import islice
+from pathlib import Path
+
+from data_access import load_json
+from order_archive import OrderArchive, load_orders
+from order_repository import open_repository
+from order_store import DATA_DIR, OrderStore
+from report_index import ReportIndex
+
+CONTENT_DIR = Path(__file__).parent.parent / "content"
+
+CONTENT_FILE = re.compile(r"content_(\d{4}-\d{2}-\d{2})\.json$")
+
+_PREDICATE = re.compile(r"^\s*([\w.]+)\s*(!=|<=|>=|=|<|>|~)\s*(.*?)\s*$")
+_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+
+# Field names are spliced into SQL (quoted aliases, json_extract paths), so only these are accepted
+_IDENTIFIER = re.compile(r"^[\w.]+$")
+
+OPS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+AGGREGATES = ("count", "sum", "avg", "min", "max")
+
+
+class QueryError(Exception):
+    """A query the planner cannot run."""
+
+
+# ----------------------------------------
+# Query model
+# ----------------------------------------
+
+class Predicate:
+    """field op value, e.g. status=shipped, total>50, tags~viral (contains)."""
+
+    def __init__(self, field, op, value):
+        self.field = field
+        self.op = op
+        self.value = value
+
+    @classmethod
+    def parse(cls, text):
+        match = _PREDICATE.match(text)
+        if not match:
+            raise QueryError(f"Bad predicate: {text!r} (expected field<op>value, op one of = != < <= > >= ~)")
+        return cls(*match.groups())
+
+    def __str__(self):
+        return f"{self.field} {self.op} {self.value}"
+
+    def matches(self, row):
+        """Evaluate against a row dict."""
+        actual = row.get(self.field)
+        if actual is None:
+            return self.op == "!="
+        if self.op == "~":
+            if isinstance(actual, (list, tuple)):
+                return any(self.value.lower() == str(v).lower() for v in actual)
+            return self.value.lower() in str(actual).lower()
+
+        expected = self.value
+        if isinstance(actual, bool):
+            expected = expected.lower() in ("1", "true", "yes")
+        elif isinstance(actual, (int, float)):
+            try:
+                expected = float(expected)
+            except ValueError:
+                return False
+        else:
+            actual = str(actual)
+        return OPS[self.op](actual, expected)
+
+    def sql(self, expr, numeric=False):
+        """(SQL fragment, params) for this predicate over a column expression."""
+        if self.op == "~":
+            return f"instr(lower({expr}), lower(?)) > 0", [self.value]
+        value = float(self.value) if numeric and _NUMBER.match(self.value) else self.value
+        return f"{expr} {self.op} ?", [value]
+
+
+class Query:
+    """One ad-hoc question against a source."""
+
+    def __init__(self, source, where=(), group_by=(), aggs=(), fields=(), order_by=None, limit=None):
+        self.source = source
+        self.where = list(where)
+        self.group_by = list(group_by)
+        self.aggs = list(aggs)
+        self.fields = list(fields)
+        self.order_by = order_by
+        self.limit = limit
+
+        for func, _ in self.aggs:
+            if func not in AGGREGATES:
+                raise QueryError(f"Unknown aggregate {func!r} (use {', '.join(AGGREGATES)})")
+
+        names = [p.field for p in self.where] + self.group_by + self.fields
+        names += [field for _, field in self.aggs if field is not None]
+        if order_by:
+            names.append(order_by[1:] if order_by.startswith("-") else order_by)
+        for name in names:
+            if not _IDENTIFIER.match(name):
+                raise QueryError(f"Invalid field name {name!r} (letters, digits, _ and . only)")
+
+    @property
+    def aggregated(self):
+        return bool(self.aggs or self.group_by)
+
+    def columns(self):
+        """Output column names."""
+        if self.aggregated:
+            return self.group_by + [agg_name(a) for a in self.aggs]
+        return self.fields
+
+
+def parse_agg(text):
+    """"count" -> ("count", None); "sum:total" -> ("sum", "total")."""
+    func, _, field = text.partition(":")
+    if func != "count" and not field:
+        raise QueryError(f"Aggregate {text!r} needs a field, e.g. {func}:total")
+    return func, field or None
+
+
+def agg_name(agg):
+    func, field = agg
+    return f"{func}_{field}" if field else func
+
+
+def field_range(where, field):
+    """Inclusive (low, high) bounds on a field implied by the predicates, for pruning."""
+    low = high = None
+    for p in where:
+        if p.field != field:
+            continue
+        if p.op in ("=", ">=", ">"):
+            low = p.value if low is None else max(low, p.value)
+        if p.op in ("=", "<=", "<"):
+            high = p.value if high is None else min(high, p.value)
+    return low, high
+
+
+# ----------------------------------------
+# Execution
+# ----------------------------------------
+
+class Plan:
+    """Chosen access path: how to explain it and how to run it."""
+
+    def __init__(self, source, access, run, pushed=(), residual=(), sql=None, params=(), conn=None):
+        self.source = source
+        self.access = access
+        self.run = run
+        self.pushed = list(pushed)
+        self.residual = list(residual)
+        self.sql = sql
+        self.params = list(params)
+        self.conn = conn
+
+    def explain(self):
+        """Plan description, one line per item."""
+        lines = [f"Source:   {self.source}", f"Access:   {self.access}"]
+        lines.append("Pushed:   " + (", ".join(map(str, self.pushed)) or "-"))
+        lines.append("Residual: " + (", ".join(map(str, self.residual)) or "-"))
+        if self.sql:
+            lines.append(f"SQL:      {' '.join(self.sql.split())}")
+            lines.append(f"Params:   {self.params}")
+            for row in self.conn.execute("EXPLAIN QUERY PLAN " + self.sql, self.params):
+                lines.append(f"SQLite:   {row[-1]}")
+        return lines
+
+
+def aggregate(rows, query):
+    """Filter, group and aggregate row dicts in one pass."""
+    where = query.where
+    rows = (r for r in rows if all(p.matches(r) for p in where))
+
+    if not query.aggregated:
+        fields = query.fields
+        for row in rows:
+            yield {f: row.get(f) for f in fields} if fields else row
+        return
+
+    groups = {}
+    for row in rows:
+        key = tuple(row.get(f) for f in query.group_by)
+        acc = groups.get(key)
+        if acc is None:
+            acc = groups[key] = [[0, 0.0, None, None] for _ in query.aggs]
+        for slot, (func, field) in zip(acc, query.aggs):
+            if field is None:
+                slot[0] += 1
+                continue
+            value = row.get(field)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            slot[0] += 1
+            slot[1] += value
+            slot[2] = value if slot[2] is None else min(slot[2], value)
+            slot[3] = value if slot[3] is None else max(slot[3], value)
+
+    for key, acc in groups.items():
+        out = dict(zip(query.group_by, key))
+        for (func, field), (n, total, low, high) in zip(query.aggs, acc):
+            out[agg_name((func, field))] = {
+                "count": n,
+                "sum": total,
+                "avg": total / n if n else None,
+                "min": low,
+                "max": high,
+            }[func]
+        yield out
+
+
+def order_and_limit(rows, query):
+    """Apply --order-by and --limit to result rows; missing values sort last."""
+    if query.order_by:
+        name = query.order_by.lstrip("-")
+        rows = list(rows)
+        present = sorted((r for r in rows if r.get(name) is not None), key=lambda r: r[name],
+                         reverse=query.order_by.startswith("-"))
+        rows = present + [r for r in rows if r.get(name) is None]
+    return list(islice(rows, query.limit))
+
+
+def scan_plan(source, access, rows, query, pushed=()):
+    """Plan for a source that is read row by row."""
+    return Plan(source, access, lambda: order_and_limit(aggregate(rows(), query), query),
+                pushed=pushed, residual=query.where)
+
+
+def sql_plan(source, access, conn, table, columns, query, numeric=(), agg_sql=None, rewrite=None):
+    """Plan that runs entirely in SQLite.
+
+    columns maps field names to SQL expressions; a _Columns fallback
+    handles fields not in the map. agg_sql(func, field)
+    may override how an aggregate is computed. rewrite(predicate) may return
+    a list of (fragment, params) to use instead of the plain comparison.
+    """
+    fallback = getattr(columns, "fallback", None)
+
+    def expr(field):
+        column = columns.get(field)
+        if column is None and fallback:
+            column = fallback(field)
+        if column is None:
+            raise QueryError(f"{source} has no field {field!r}")
+        return column
+
+    clauses, params = [], []
+    for p in query.where:
+        parts = rewrite(p) if rewrite else None
+        for fragment, values in parts or [p.sql(expr(p.field), p.field in numeric)]:
+            clauses.append(fragment)
+            params.extend(values)
+
+    if query.aggregated:
+        select = [f"{expr(f)} AS \"{f}\"" for f in query.group_by]
+        for func, field in query.aggs:
+            sql = agg_sql(func, field) if agg_sql else None
+            if sql is None:
+                sql = "COUNT(*)" if field is None else f"{func.upper()}({expr(field)})"
+            select.append(f"{sql} AS \"{agg_name((func, field))}\"")
+    else:
+        fields = query.fields or list(columns)
+        select = [f"{expr(f)} AS \"{f}\"" for f in fields]
+
+    sql = f"SELECT {', '.join(select)} FROM {table}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    if query.group_by:
+        sql += " GROUP BY " + ", ".join(f"\"{f}\"" for f in query.group_by)
+    if query.order_by:
+        name = query.order_by.lstrip("-")
+        sql += f" ORDER BY \"{name}\" IS NULL, \"{name}\"" + (" DESC" if query.order_by.startswith("-") else "")
+    if query.limit is not None:
+        sql += " LIMIT ?"
+        params.append(query.limit)
+
+    def run():
+        return [dict(r) for r in conn.execute(sql, params)]
+
+    return Plan(source, access, run, pushed=query.where, sql=sql, params=params, conn=conn)
+
+
+# ----------------------------------------
+# Sources
+# ----------------------------------------
+
+class _Columns(dict):
+    """Column map with a fallback for fields stored in a JSON document column."""
+
+    def __init__(self, columns, fallback=None):
+        super().__init__(columns)
+        self.fallback = fallback
+
+
+ORDER_COLUMNS = {
+    "id": "id",
+    "status": "status",
+    "created_at": "created_at",
+    "day": "substr(created_at, 1, 10)",
+    "product": "COALESCE(product, product_id, '')",
+    "product_id": "product_id",
+    "quantity": "quantity",
+    "total": "total",
+    "cost": "ROUND(cost, 2)",
+    "profit": "ROUND(total - cost, 2)",
+}
+ORDER_NUMERIC = {"quantity", "total", "cost", "profit"}
+
+# Aggregates the rollups can answer: (func, field) -> SQL over daily_rollups
+ROLLUP_AGGS = {
+    ("count", None): "SUM(orders)",
+    ("sum", "quantity"): "SUM(units)",
+    ("sum", "total"): "SUM(revenue)",
+    ("sum", "cost"): "SUM(cost)",
+    ("sum", "profit"): "SUM(profit)",
+    ("avg", "total"): "SUM(revenue) / SUM(orders)",
+}
+ROLLUP_FIELDS = {"day", "product", "status"}
+
+
+def _day_rewrite(p):
+    """day predicates as created_at ranges, so the created_at index applies."""
+    if p.field != "day" or p.op in ("~", "!="):
+        return None
+    upper = p.value + "~"  # Sorts after any time suffix on that day
+    return {
+        "=": [("created_at >= ?", [p.value]), ("created_at <= ?", [upper])],
+        ">=": [("created_at >= ?", [p.value])],
+        ">": [("created_at > ?", [upper])],
+        "<=": [("created_at <= ?", [upper])],
+        "<": [("created_at < ?", [p.value])],
+    }[p.op]
+
+
+def _order_row(order):
+    row = order.to_dict()
+    row["status"] = order.status
+    row["day"] = order.day
+    row["product"] = order.product or order.product_id or ""
+    # Unknown cost stays None, as in the repository's NULL cost column
+    row["cost"] = order.cost
+    row["profit"] = order.profit if order.cost is not None else None
+    return row
+
+
+def plan_orders(query, data_dir=DATA_DIR, scan=False):
+    store = OrderStore(data_dir)
+    if scan:
+        start, end = field_range(query.where, "day")
+        archive = OrderArchive(data_dir)
+        months = archive.partitions_for(start, end)
+        total = len(archive.manifest["partitions"])
+        access = f"archive partitions {', '.join(months) or '(none)'} ({len(months)} of {total}) + live store"
+        pushed = [p for p in query.where if p.field == "day" and p.op not in ("~", "!=")]
+        return scan_plan("orders", access, lambda: map(_order_row, load_orders(data_dir, start, end, store)),
+                         query, pushed)
+
+    conn = open_repository(data_dir, store).conn
+    dimensions = set(query.group_by) | {p.field for p in query.where}
+    if query.aggregated and dimensions <= ROLLUP_FIELDS and all(a in ROLLUP_AGGS for a in query.aggs):
+        return sql_plan("orders", "daily_rollups (pre-aggregated by day, product and status)", conn,
+                        "daily_rollups", {f: f for f in ROLLUP_FIELDS}, query,
+                        agg_sql=lambda func, field: ROLLUP_AGGS[(func, field)])
+
+    columns = _Columns(ORDER_COLUMNS, lambda field: f"json_extract(doc, '$.{field}')")
+    return sql_plan("orders", "orders table (data/orders.db)", conn, "orders", columns, query,
+                    numeric=ORDER_NUMERIC, rewrite=_day_rewrite)
+
+
+def plan_reports(query, table="metrics"):
+    index = ReportIndex()
+    index.update()
+    if table == "metrics":
+        columns = {"date": "date", "metric": "metric", "value": "value", "source": "source"}
+        numeric = {"value"}
+    else:
+        columns = {c: c for c in ("date", "rank", "name", "niche", "cost", "retail", "margin", "viral_score", "score", "source")}
+        numeric = {"rank", "cost", "retail", "margin", "viral_score", "score"}
+    return sql_plan("reports" if table == "metrics" else "research", f"{table} table (data/reports.db)",
+                    index.conn, table, columns, query, numeric=numeric)
+
+
+def plan_content(query, content_dir=CONTENT_DIR):
+    start, end = field_range(query.where, "date")
+    files = []
+    for path in sorted(content_dir.glob("content_*.json")):
+        match = CONTENT_FILE.search(path.name)
+        if not match:
+            continue
+        day = match.group(1)
+        if (start and day < start) or (end and day > end):
+            continue
+        files.append((day, path))
+    total = sum(1 for _ in content_dir.glob("content_*.json"))
+
+    def rows():
+        for day, path in files:
+            pieces, _ = load_json(path, [])
+            for piece in pieces or []:
+                yield {
+                    "date": day,
+                    "type": piece.get("type"),
+                    "product": piece.get("product"),
+                    "generated_at": piece.get("generated_at"),
+                    "scheduled_for": piece.get("scheduled_for"),
+                }
+
+    pushed = [p for p in query.where if p.field == "date" and p.op not in ("~", "!=")]
+    return scan_plan("content", f"content files ({len(files)} of {total})", rows, query, pushed)
+
+
+def plan_products(query, data_dir=DATA_DIR):
+    def rows():
+        catalog, _ = load_json(data_dir / "products.json", {})
+        return iter((catalog or {}).get("products", []))
+
+    return scan_plan("products", "catalog scan (data/products.json)", rows, query)
+
+
+SOURCES = {
+    "orders": plan_orders,
+    "reports": plan_reports,
+    "research": lambda query: plan_reports(query, "research_products"),
+    "content": plan_content,
+    "products": plan_products,
+}
+
+
+def plan(query, scan=False):
+    """Pick the access path for a query."""
+    if query.source == "orders":
+        return plan_orders(query, scan=scan)
+    return SOURCES[query.source](query)
+
+
+# ----------------------------------------
+# Output
+# ----------------------------------------
+
+def _cell(value):
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return "" if value is None else str(value)
+
+
+def print_table(rows, columns=None):
+    """Rows as an aligned text table."""
+    if not rows:
+        print("(no rows)")
+        return
+    columns = columns or list(dict.fromkeys(k for r in rows for k in r))
+    cells = [[_cell(r.get(c)) for c in columns] for r in rows]
+    widths = [min(40, max(len(c), *(len(row[i]) for row in cells))) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in cells:
+        print("  ".join(v[:w].ljust(w) for v, w in zip(row, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ad-hoc SellBuddy analytics queries')
+    parser.add_argument('source', choices=sorted(SOURCES), help='What to query')
+    parser.add_argument('--where', '-w', action='append', default=[], help='Filter, e.g. status=shipped, total>50, tags~viral (repeatable)')
+    parser.add_argument('--group-by', '-g', default='', help='Comma-separated fields to group by')
+    parser.add_argument('--agg', '-a', action='append', default=[], help='count, sum:F, avg:F, min:F or max:F (repeatable)')
+    parser.add_argument('--fields', '-f', default='', help='Comma-separated fields to show (row queries)')
+    parser.add_argument('--order-by', '-o', help="Output column to sort by; --order-by=-COL for descending")
+    parser.add_argument('--limit', '-n', type=int, help='Return at most N rows')
+    parser.add_argument('--scan', action='store_true', help='Orders: read archive partitions instead of the repository')
+    parser.add_argument('--explain', action='store_true', help='Show the plan without running the query')
+    parser.add_argument('--json', action='store_true', help='Print rows as JSON lines')
+
+    args = parser.parse_args()
+
+    try:
+        query = Query(
+            args.source,
+            where=[Predicate.parse(w) for w in args.where],
+            group_by=[f for f in args.group_by.split(",") if f],
+            aggs=[parse_agg(a) for a in args.agg],
+            fields=[f for f in args.fields.split(",") if f],
+            order_by=args.order_by,
+            limit=args.limit if args.limit is not None or args.agg or args.group_by else 50,
+        )
+        started = time.perf_counter()
+        chosen = plan(query, scan=args.scan)
+        planned = time.perf_counter()
+
+        if args.explain:
+            print("\n".join(chosen.explain()))
+            print(f"Planned in {(planned - started) * 1000:.1f} ms")
+            return
+
+        rows = chosen.run()
+        finished = time.perf_counter()
+    except (QueryError, sqlite3.Error) as e:
+        print(f"Query failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        for row in rows:
+            print(json.dumps(row))
+    else:
+        print_table(rows, query.columns() or None)
+    print(f"\n{len(rows)} rows | {chosen.access} | plan {(planned - started) * 1000:.1f} ms, "
+          f"run {(finished - planned) * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
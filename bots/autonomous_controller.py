@@ -12,13 +12,23 @@ ZERO HUMAN INTERVENTION REQUIRED
 """
 
 import os
-import json
 import random
 import hashlib
 from datetime import datetime, timedelta
 from pathlib import Path
 import subprocess
-import sys
+import argparse
+from contextlib import contextmanager
+from itertools import islice
+
+from data_access import Session, atomic_write_json, content_hash, load_json, update_json
+from order_schema import Order
+from order_store import OrderStore
+from order_archive import OrderArchive
+from product_index import ProductIndex, slugify
+from catalog_bulk import draw_batch, make_rng, stream_catalog
+from template_space import TemplateSpace, fill_name
+from report_index import index_report
 
 # ============================================
 # CONFIGURATION
@@ -42,6 +52,9 @@ CONFIG = {
     "min_margin": 50,  # Minimum profit margin %
     "max_products": 20,  # Maximum products in store
     "content_per_day": 3,  # Social posts to generate daily
+
+    # Storage
+    "pretty_json": True,  # Indent the committed products.json/orders.json for readable diffs
 }
 
 # Trending product templates (auto-expanded)
@@ -98,83 +111,139 @@ FREE_IMAGE_SOURCES = [
     "https://picsum.photos/seed/{seed}/600/600",
 ]
 
+PRODUCT_DESCRIPTIONS = [
+    "Transform your {category} experience with our {name}.",
+    "The viral {name} everyone's talking about on TikTok.",
+    "Premium quality {name} at an unbeatable price.",
+    "Upgrade your life with this amazing {name}.",
+]
+
+PRODUCT_BADGES = ["NEW", "TRENDING", "HOT", "BESTSELLER", None, None]
+
+# Every name the templates can produce, enumerated lazily
+TEMPLATE_SPACE = TemplateSpace(TRENDING_PRODUCT_TEMPLATES)
+
 
 # ============================================
 # AUTONOMOUS PRODUCT GENERATOR
 # ============================================
 
+def _empty_catalog():
+    return {"products": [], "lastUpdated": None}
+
+
+def _record_hashes(products):
+    """Content hash of each product, keyed by ID."""
+    return {p.get("id"): content_hash(p) for p in products}
+
+
+def _product_text(name, category, rng=random):
+    """Description and image URL for a product."""
+    description = rng.choice(PRODUCT_DESCRIPTIONS).format(category=category.lower(), name=name)
+    query = name.lower().replace(" ", "+")
+    seed = hashlib.md5(name.encode()).hexdigest()[:8]
+    image = rng.choice(FREE_IMAGE_SOURCES).format(query=query, seed=seed)
+    return description, image
+
+
 class AutonomousProductGenerator:
     """Generates new products automatically based on trends."""
 
     def __init__(self):
         self.products_file = CONFIG["data_dir"] / "products.json"
+        self.index = ProductIndex(CONFIG["data_dir"] / "product_index.json")
         self.products = self._load_products()
+        self._session = None
+        self._index_dirty = False
+        self.changed_ids = set()
 
     def _load_products(self):
         """Load existing products."""
-        try:
-            with open(self.products_file, "r") as f:
-                return json.load(f)
-        except:
-            return {"products": [], "lastUpdated": None}
-
-    def _save_products(self):
-        """Save products to file."""
-        self.products["lastUpdated"] = datetime.now().isoformat()
-        with open(self.products_file, "w") as f:
-            json.dump(self.products, f, indent=2)
+        data, _ = load_json(self.products_file)
+        return data or _empty_catalog()
+
+    def _update_products(self, mutate):
+        """Apply mutate to the latest products.json under its lock and save it.
+
+        Other bots may have saved since we loaded, so changes are always made
+        to a fresh read rather than written over it from self.products.
+        Products whose content hash is unchanged are not dirty; if none are,
+        lastUpdated stays put and the file is not rewritten. The ID index is
+        brought up to date first and saved with the catalog, under its lock.
+        """
+        changed = set()
+        indent = 2 if CONFIG["pretty_json"] else None
+
+        def apply(data):
+            self.index.sync(data)
+            before = _record_hashes(data.setdefault("products", []))
+            result = mutate(data)
+            after = _record_hashes(data["products"])
+            changed.update(k for k in before.keys() | after.keys() if before.get(k) != after.get(k))
+            if changed:
+                data["lastUpdated"] = datetime.now().isoformat()
+                for product_id in after.keys() - before.keys():
+                    self.index.add(product_id)
+                self.index.mark_saved(data["lastUpdated"], len(data["products"]))
+                if self._session:
+                    self._index_dirty = True
+                else:
+                    self.index.save()
+            return result
+
+        if self._session:
+            self.products = self._session.load(self.products_file, _empty_catalog)
+            result = apply(self.products)
+            if changed:
+                self._session.mark_dirty(self.products_file)
+            self.changed_ids |= changed
+            return result
+
+        self.products, result = update_json(self.products_file, apply, _empty_catalog, indent)
+        self.changed_ids |= changed
+        return result
+
+    @contextmanager
+    def session(self):
+        """Batch catalog changes so products.json is written once, when the block exits."""
+        with Session(pretty=CONFIG["pretty_json"]) as session:
+            self._session = session
+            try:
+                yield session
+                if self._index_dirty:
+                    self.index.save()
+            finally:
+                self._session = None
+                self._index_dirty = False
 
     def generate_product_id(self, name):
-        """Generate unique product ID."""
-        base = name.lower().replace(" ", "-")
-        base = ''.join(c for c in base if c.isalnum() or c == '-')
-        return base[:30]
-
-    def generate_product(self, category_data):
-        """Generate a single product from template."""
-        template = random.choice(category_data["templates"])
-
-        # Fill in template variables
-        name = template["name"]
-        for key, values in category_data.items():
-            if key not in ["category", "templates"] and isinstance(values, list):
-                placeholder = "{" + key.rstrip("s") + "}"
-                if placeholder in name:
-                    name = name.replace(placeholder, random.choice(values))
+        """Product ID for a name; add_new_product() makes it unique."""
+        return slugify(name)
+
+    def generate_product(self, category_data, template=None, name=None):
+        """Generate a single product from template (a random one unless given)."""
+        template = template or random.choice(category_data["templates"])
+        name = name or fill_name(template, category_data)
 
         # Generate pricing
         base_price = template["base_price"] * (0.8 + random.random() * 0.4)
         retail_price = base_price * template["retail_multi"]
         retail_price = round(retail_price * 2) / 2 - 0.01  # Round to .99 or .49
 
-        # Generate description
-        descriptions = [
-            f"Transform your {category_data['category'].lower()} experience with our {name}.",
-            f"The viral {name} everyone's talking about on TikTok.",
-            f"Premium quality {name} at an unbeatable price.",
-            f"Upgrade your life with this amazing {name}.",
-        ]
-
-        # Generate image URL
-        query = name.lower().replace(" ", "+")
-        seed = hashlib.md5(name.encode()).hexdigest()[:8]
-        image = random.choice([
-            f"https://source.unsplash.com/600x600/?{query}",
-            f"https://picsum.photos/seed/{seed}/600/600"
-        ])
+        description, image = _product_text(name, category_data["category"])
 
         product = {
             "id": self.generate_product_id(name),
             "name": name,
             "category": category_data["category"],
-            "description": random.choice(descriptions),
+            "description": description,
             "price": round(retail_price, 2),
             "originalPrice": round(retail_price * 1.6, 2),
             "discount": random.randint(35, 55),
             "image": image,
             "rating": round(4.5 + random.random() * 0.4, 1),
             "reviews": random.randint(500, 5000),
-            "badge": random.choice(["NEW", "TRENDING", "HOT", "BESTSELLER", None, None]),
+            "badge": random.choice(PRODUCT_BADGES),
             "features": self._generate_features(category_data["category"]),
             "margin": round((1 - base_price / retail_price) * 100),
             "wholesaleCost": round(base_price, 2),
@@ -184,7 +253,72 @@ class AutonomousProductGenerator:
 
         return product
 
-    def _generate_features(self, category):
+    def generate_bulk(self, count, batch_size=10000, output=None, seed=None):
+        """Generate count products in batches, streaming them to disk; returns how many were added.
+
+        Names walk TEMPLATE_SPACE without replacement, names already in the
+        catalog first skipped; only once every name is used do they repeat
+        (IDs stay unique). Prices come from catalog_bulk.draw_batch() a
+        batch at a time. This is for seeding and stress tests, so
+        CONFIG["max_products"] does not apply. New products are appended to
+        products.json under its lock, or written as a catalog of their own
+        to output. Bulk catalogs are written compact whatever
+        CONFIG["pretty_json"] says; the next save that changes the catalog
+        re-indents products.json.
+        """
+        rng = random.Random(seed)
+        batch_rng = make_rng(seed)
+        rows = TEMPLATE_SPACE.rows
+        base_prices = [t["base_price"] for _, t, _, _ in rows]
+        retail_multis = [t["retail_multi"] for _, t, _, _ in rows]
+        added_at = datetime.now().isoformat()
+
+        def products(index, existing):
+            names = TEMPLATE_SPACE.names(existing, rng)
+            remaining = count
+            while remaining > 0:
+                batch = list(islice(names, min(batch_size, remaining)))
+                if not batch:
+                    break
+                cols = draw_batch(base_prices, retail_multis, len(batch), batch_rng, [t for t, _ in batch])
+                for i, (t, name) in enumerate(batch):
+                    category = rows[t][0]["category"]
+                    description, image = _product_text(name, category, rng)
+                    yield {
+                        "id": index.allocate(name),
+                        "name": name,
+                        "category": category,
+                        "description": description,
+                        "price": cols["price"][i],
+                        "originalPrice": cols["originalPrice"][i],
+                        "discount": cols["discount"][i],
+                        "image": image,
+                        "rating": cols["rating"][i],
+                        "reviews": cols["reviews"][i],
+                        "badge": rng.choice(PRODUCT_BADGES),
+                        "features": self._generate_features(category, rng),
+                        "margin": cols["margin"][i],
+                        "wholesaleCost": cols["wholesaleCost"][i],
+                        "addedAt": added_at,
+                        "autoGenerated": True
+                    }
+                remaining -= len(batch)
+
+        if output:
+            return stream_catalog(output, {"lastUpdated": added_at}, products(ProductIndex(), ()), None)
+
+        # The session holds the products.json lock; the file is streamed rather than committed
+        with Session() as session:
+            catalog = session.load(self.products_file, _empty_catalog)
+            self.index.sync(catalog)
+            catalog["lastUpdated"] = added_at
+            existing = {p.get("name") for p in catalog["products"]}
+            added = stream_catalog(self.products_file, catalog, products(self.index, existing), None)
+            self.index.mark_saved(added_at, len(catalog["products"]) + added)
+            self.index.save()
+        return added
+
+    def _generate_features(self, category, rng=random):
         """Generate product features based on category."""
         features_db = {
             "Smart Home": ["App controlled", "Timer function", "Multiple colors", "USB powered", "Remote included"],
@@ -195,7 +329,7 @@ class AutonomousProductGenerator:
             "Accessories": ["Premium quality", "Gift box included", "Adjustable", "Hypoallergenic"],
         }
         base_features = features_db.get(category, ["High quality", "Fast shipping", "30-day guarantee"])
-        return random.sample(base_features, min(4, len(base_features)))
+        return rng.sample(base_features, min(4, len(base_features)))
 
     def should_add_product(self):
         """Determine if we should add a new product."""
@@ -217,34 +351,39 @@ class AutonomousProductGenerator:
         if not self.should_add_product():
             return None
 
-        # Pick random category
-        category_data = random.choice(TRENDING_PRODUCT_TEMPLATES)
-        product = self.generate_product(category_data)
-
-        # Check for duplicates
-        existing_ids = [p["id"] for p in self.products.get("products", [])]
-        if product["id"] in existing_ids:
-            product["id"] += "-" + hashlib.md5(str(random.random()).encode()).hexdigest()[:4]
-
-        # Add to products
-        if "products" not in self.products:
-            self.products["products"] = []
+        # First template name not in the catalog yet; random repeats once all are taken
+        existing = {p.get("name") for p in self.products.get("products", [])}
+        row, name = next(TEMPLATE_SPACE.unseen(existing, random), (None, None))
+        if row is None:
+            product = self.generate_product(random.choice(TRENDING_PRODUCT_TEMPLATES))
+        else:
+            category_data, template, _, _ = TEMPLATE_SPACE.rows[row]
+            product = self.generate_product(category_data, template, name)
 
-        self.products["products"].append(product)
-        self._save_products()
+        def add(data):
+            # Allocate against every ID ever used, including ones on disk now
+            product["id"] = self.index.allocate(product["name"])
+            data["products"].append(product)
 
+        self._update_products(add)
         return product
 
     def update_prices(self):
-        """Dynamically adjust prices based on 'demand'."""
-        for product in self.products.get("products", []):
-            # Simulate demand fluctuation
-            if random.random() < 0.1:  # 10% chance of price change
-                change = random.uniform(-0.05, 0.10)  # -5% to +10%
-                product["price"] = round(product["price"] * (1 + change), 2)
-                product["originalPrice"] = round(product["price"] * 1.6, 2)
-
-        self._save_products()
+        """Dynamically adjust prices based on 'demand'; returns how many changed."""
+        def reprice(data):
+            changed = 0
+            for product in data["products"]:
+                # Simulate demand fluctuation
+                if random.random() < 0.1:  # 10% chance of price change
+                    change = random.uniform(-0.05, 0.10)  # -5% to +10%
+                    price = round(product["price"] * (1 + change), 2)
+                    if price != product["price"]:
+                        product["price"] = price
+                        product["originalPrice"] = round(price * 1.6, 2)
+                        changed += 1
+            return changed
+
+        return self._update_products(reprice)
 
     def remove_low_performers(self):
         """Remove products with low simulated performance."""
@@ -253,12 +392,14 @@ class AutonomousProductGenerator:
 
         # Simulate removal of 'low performing' auto-generated products
         if random.random() < 0.1:  # 10% chance
-            auto_products = [p for p in self.products["products"] if p.get("autoGenerated")]
-            if auto_products:
-                to_remove = random.choice(auto_products)
-                self.products["products"].remove(to_remove)
-                self._save_products()
-                return to_remove
+            def remove(data):
+                auto_products = [p for p in data["products"] if p.get("autoGenerated")]
+                if auto_products:
+                    to_remove = random.choice(auto_products)
+                    data["products"].remove(to_remove)
+                    return to_remove
+
+            return self._update_products(remove)
         return None
 
 
@@ -299,8 +440,7 @@ class AutonomousContentGenerator:
         # Save to file
         date_str = datetime.now().strftime("%Y-%m-%d")
         content_file = self.content_dir / f"content_{date_str}.json"
-        with open(content_file, "w") as f:
-            json.dump(content_items, f, indent=2)
+        atomic_write_json(content_file, content_items)
 
         return content_items
 
@@ -360,21 +500,8 @@ class AutonomousOrderHandler:
     """Handles orders automatically via webhooks and email."""
 
     def __init__(self):
-        self.orders_file = CONFIG["data_dir"] / "orders.json"
-        self.orders = self._load_orders()
-
-    def _load_orders(self):
-        """Load existing orders."""
-        try:
-            with open(self.orders_file, "r") as f:
-                return json.load(f)
-        except:
-            return {"orders": [], "stats": {"total": 0, "revenue": 0}}
-
-    def _save_orders(self):
-        """Save orders."""
-        with open(self.orders_file, "w") as f:
-            json.dump(self.orders, f, indent=2)
+        self.store = OrderStore(CONFIG["data_dir"], pretty=CONFIG["pretty_json"])
+        self.archive = OrderArchive(CONFIG["data_dir"])
 
     def simulate_order(self, products):
         """Simulate an order (for testing/demo)."""
@@ -384,59 +511,65 @@ class AutonomousOrderHandler:
         product = random.choice(products)
         quantity = random.randint(1, 3)
 
-        order = {
-            "id": f"SB-{datetime.now().strftime('%y%m%d')}-{random.randint(1000,9999)}",
-            "product": product["name"],
-            "product_id": product["id"],
-            "quantity": quantity,
-            "price": product["price"],
-            "total": round(product["price"] * quantity, 2),
-            "status": "pending",
-            "created_at": datetime.now().isoformat(),
-            "simulated": True
-        }
-
-        self.orders["orders"].append(order)
-        self.orders["stats"]["total"] += 1
-        self.orders["stats"]["revenue"] = round(
-            self.orders["stats"]["revenue"] + order["total"], 2
+        unit_cost = product.get("cost", product.get("wholesaleCost"))
+
+        order = Order(
+            id=f"SB-{datetime.now().strftime('%y%m%d')}-{random.randint(1000,9999)}",
+            created_at=datetime.now().isoformat(),
+            product=product["name"],
+            product_id=product["id"],
+            quantity=quantity,
+            price=product["price"],
+            total=round(product["price"] * quantity, 2),
+            cost=round(unit_cost * quantity, 2) if unit_cost is not None else None,
+            simulated=True
         )
 
-        self._save_orders()
-        return order
+        return self.store.add(order)
 
     def process_pending_orders(self):
         """Process pending orders (simulate fulfillment)."""
         processed = []
 
-        for order in self.orders.get("orders", []):
-            if order.get("status") == "pending":
-                # Simulate processing
-                if random.random() < 0.3:  # 30% chance per run
-                    order["status"] = "processing"
-                    order["processed_at"] = datetime.now().isoformat()
-                    processed.append(order)
-
-            elif order.get("status") == "processing":
-                # Simulate shipping
-                if random.random() < 0.2:  # 20% chance per run
-                    order["status"] = "shipped"
-                    order["tracking"] = f"TRK{random.randint(10000000, 99999999)}"
-                    order["shipped_at"] = datetime.now().isoformat()
-                    processed.append(order)
-
-        self._save_orders()
+        # One journal write for the whole pass
+        with self.store.batch():
+            for order in self.store.active_orders():
+                if order.status == "pending":
+                    # Simulate processing
+                    if random.random() < 0.3:  # 30% chance per run
+                        self.store.update(
+                            order.id,
+                            status="processing",
+                            processed_at=datetime.now().isoformat()
+                        )
+                        processed.append(order)
+
+                elif order.status == "processing":
+                    # Simulate shipping
+                    if random.random() < 0.2:  # 20% chance per run
+                        self.store.update(
+                            order.id,
+                            status="shipped",
+                            tracking=f"TRK{random.randint(10000000, 99999999)}",
+                            shipped_at=datetime.now().isoformat()
+                        )
+                        processed.append(order)
+
         return processed
 
+    def archive_closed_orders(self):
+        """Move delivered, cancelled and refunded orders to monthly partitions."""
+        return self.archive.archive(self.store)
+
     def get_stats(self):
         """Get order statistics."""
-        orders = self.orders.get("orders", [])
+        counts = self.store.status_counts
         return {
-            "total_orders": len(orders),
-            "pending": len([o for o in orders if o.get("status") == "pending"]),
-            "processing": len([o for o in orders if o.get("status") == "processing"]),
-            "shipped": len([o for o in orders if o.get("status") == "shipped"]),
-            "revenue": self.orders.get("stats", {}).get("revenue", 0)
+            "total_orders": self.store.stats.get("totalOrders", 0),
+            "pending": counts.get("pending", 0),
+            "processing": counts.get("processing", 0),
+            "shipped": counts.get("shipped", 0),
+            "revenue": self.store.stats.get("totalRevenue", 0)
         }
 
 
@@ -453,40 +586,49 @@ class AutonomousAnalytics:
 
     def generate_daily_report(self, products, orders, content):
         """Generate daily analytics report."""
-        report = {
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "generated_at": datetime.now().isoformat(),
-            "products": {
-                "total": len(products),
-                "avg_price": round(sum(p["price"] for p in products) / len(products), 2) if products else 0,
-                "avg_margin": round(sum(p.get("margin", 50) for p in products) / len(products), 1) if products else 0,
-            },
+        report = self.build_report(
+            datetime.now().strftime("%Y-%m-%d"), products, orders, len(content) if content else 0
+        )
+        self.save_report(report)
+        return report
+
+    def build_report(self, date, products, orders, content_count, generated_at=None):
+        """Daily report document; depends only on its arguments, so backfills can rebuild it."""
+        summary = {
+            "total": len(products),
+            "avg_price": round(sum(p["price"] for p in products) / len(products), 2) if products else 0,
+            "avg_margin": round(sum(p.get("margin", 50) for p in products) / len(products), 1) if products else 0,
+        }
+        return {
+            "date": date,
+            "generated_at": generated_at or datetime.now().isoformat(),
+            "products": summary,
             "orders": orders,
             "content": {
-                "generated_today": len(content) if content else 0,
+                "generated_today": content_count,
             },
-            "recommendations": self._generate_recommendations(products, orders)
+            "recommendations": self.recommendations(summary, orders)
         }
 
-        # Save report
+    def save_report(self, report, index=True):
+        """Write daily_report_<date>.json and add it to the report index."""
         report_file = self.reports_dir / f"daily_report_{report['date']}.json"
-        with open(report_file, "w") as f:
-            json.dump(report, f, indent=2)
-
-        return report
+        atomic_write_json(report_file, report)
+        if index:
+            index_report(report_file)
+        return report_file
 
-    def _generate_recommendations(self, products, orders):
-        """Generate AI recommendations."""
+    def recommendations(self, summary, orders):
+        """Generate AI recommendations from a report's product summary and order stats."""
         recs = []
 
-        if len(products) < 10:
+        if summary["total"] < 10:
             recs.append("Add more products to increase variety")
 
         if orders.get("pending", 0) > 5:
             recs.append("Process pending orders to improve customer satisfaction")
 
-        avg_margin = sum(p.get("margin", 50) for p in products) / len(products) if products else 0
-        if avg_margin < 50:
+        if summary["avg_margin"] < 50:
             recs.append("Consider removing low-margin products")
 
         return recs if recs else ["Business is running optimally!"]
@@ -522,22 +664,24 @@ class AutonomousController:
         print("1. PRODUCT MANAGEMENT")
         print("-" * 40)
 
-        # Add new product
-        new_product = self.product_gen.add_new_product()
-        if new_product:
-            print(f"   ✓ Added new product: {new_product['name']}")
-            results["tasks"].append({"task": "add_product", "product": new_product["name"]})
-        else:
-            print("   - No new product added this run")
+        # All catalog changes are saved together when the session ends
+        with self.product_gen.session():
+            # Add new product
+            new_product = self.product_gen.add_new_product()
+            if new_product:
+                print(f"   ✓ Added new product: {new_product['name']}")
+                results["tasks"].append({"task": "add_product", "product": new_product["name"]})
+            else:
+                print("   - No new product added this run")
 
-        # Update prices
-        self.product_gen.update_prices()
-        print("   ✓ Prices updated")
+            # Update prices
+            repriced = self.product_gen.update_prices()
+            print(f"   ✓ Prices updated ({repriced} changed)")
 
-        # Remove low performers
-        removed = self.product_gen.remove_low_performers()
-        if removed:
-            print(f"   ✓ Removed low performer: {removed['name']}")
+            # Remove low performers
+            removed = self.product_gen.remove_low_performers()
+            if removed:
+                print(f"   ✓ Removed low performer: {removed['name']}")
 
         products = self.product_gen.products.get("products", [])
         print(f"   Total products: {len(products)}")
@@ -564,14 +708,18 @@ class AutonomousController:
         if products and random.random() < 0.2:  # 20% chance
             order = self.order_handler.simulate_order(products)
             if order:
-                print(f"   ✓ New order: {order['id']} - {order['product']}")
-                results["tasks"].append({"task": "new_order", "order_id": order["id"]})
+                print(f"   ✓ New order: {order.id} - {order.product}")
+                results["tasks"].append({"task": "new_order", "order_id": order.id})
 
         # Process existing orders
         processed = self.order_handler.process_pending_orders()
         if processed:
             print(f"   ✓ Processed {len(processed)} orders")
 
+        archived = self.order_handler.archive_closed_orders()
+        if archived:
+            print(f"   ✓ Archived {archived} closed orders")
+
         stats = self.order_handler.get_stats()
         print(f"   Order Stats: {stats['total_orders']} total, ${stats['revenue']} revenue")
 
@@ -606,8 +754,13 @@ class AutonomousController:
     def run_hourly_tasks(self):
         """Quick hourly checks."""
         # Process any pending orders
-        self.order_handler.process_pending_orders()
-        return {"task": "hourly_check", "completed_at": datetime.now().isoformat()}
+        processed = self.order_handler.process_pending_orders()
+        return {
+            "task": "hourly_check",
+            "processed": len(processed),
+            "orders": self.order_handler.get_stats(),
+            "completed_at": datetime.now().isoformat()
+        }
 
 
 # ============================================
@@ -616,29 +769,33 @@ class AutonomousController:
 
 def main():
     """Main entry point."""
-    controller = AutonomousController()
+    parser = argparse.ArgumentParser(description='SellBuddy autonomous controller')
+    parser.add_argument('task', nargs='?', default='daily', choices=['daily', 'hourly', 'generate'], help='Task to run')
+    parser.add_argument('--count', '-n', type=int, default=1000, help='generate: products to add')
+    parser.add_argument('--batch-size', type=int, default=10000, help='generate: products priced per batch')
+    parser.add_argument('--output', '-o', type=Path, help='generate: write a separate catalog here instead of products.json')
+    parser.add_argument('--seed', type=int, help='generate: random seed for reproducible catalogs')
+
+    args = parser.parse_args()
+
+    if args.task == "generate":
+        started = datetime.now()
+        added = AutonomousProductGenerator().generate_bulk(args.count, args.batch_size, args.output, args.seed)
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"Generated {added} products in {elapsed:.1f}s -> {args.output or CONFIG['data_dir'] / 'products.json'}")
+        return
 
-    # Determine what to run based on arguments
-    if len(sys.argv) > 1:
-        task = sys.argv[1]
-        if task == "hourly":
-            result = controller.run_hourly_tasks()
-        elif task == "daily":
-            result = controller.run_daily_tasks()
-        else:
-            print(f"Unknown task: {task}")
-            print("Usage: python autonomous_controller.py [daily|hourly]")
-            return
+    controller = AutonomousController()
+    if args.task == "hourly":
+        result = controller.run_hourly_tasks()
     else:
-        # Default: run daily tasks
         result = controller.run_daily_tasks()
 
     # Save run log
     log_dir = CONFIG["data_dir"] / "logs"
     log_dir.mkdir(exist_ok=True)
     log_file = log_dir / f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(log_file, "w") as f:
-        json.dump(result, f, indent=2)
+    atomic_write_json(log_file, result)
 
     print(f"\nRun log saved to: {log_file}")
 
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Bulk Catalog
+Batch pricing and streaming writes for catalogs of 100k+ products.
+
+draw_batch() picks a template for every row of a batch and computes the
+wholesale cost, retail price, original price, margin, discount, rating and
+review count as whole columns: NumPy arrays when NumPy is installed,
+otherwise array.array columns filled in one loop each. stream_catalog()
+writes products.json from the existing products and an iterator of new
+ones without ever holding the new products in one list, so memory stays at
+one batch however large the catalog grows.
+
+AutonomousProductGenerator.generate_bulk() builds products from these
+columns; run it with:
+
+Usage:
+    python autonomous_controller.py generate --count 100000
+    python autonomous_controller.py generate --count 5000 --output /tmp/catalog.json --seed 1
+"""
+
+import os
+import json
+import random
+import tempfile
+from array import array
+from pathlib import Path
+
+from columnar import np
+
+
+def make_rng(seed=None):
+    """Random source for draw_batch()."""
+    return np.random.default_rng(seed) if np is not None else random.Random(seed)
+
+
+def draw_batch(base_prices, retail_multis, size, rng, template=None):
+    """Template choice and pricing columns for size new products.
+
+    base_prices and retail_multis are per template; pass template to price
+    rows whose templates are already chosen. Every returned column is a
+    plain list of length size.
+    """
+    if np is not None:
+        if template is None:
+            template = rng.integers(0, len(base_prices), size)
+        template = np.asarray(template, dtype=np.int64)
+        base = np.asarray(base_prices, dtype=float)[template] * (0.8 + rng.random(size) * 0.4)
+        retail = np.round(base * np.asarray(retail_multis, dtype=float)[template] * 2) / 2 - 0.01
+        columns = {
+            "template": template,
+            "wholesaleCost": np.round(base, 2),
+            "price": np.round(retail, 2),
+            "originalPrice": np.round(retail * 1.6, 2),
+            "margin": np.round((1 - base / retail) * 100).astype(int),
+            "discount": rng.integers(35, 56, size),
+            "rating": np.round(4.5 + rng.random(size) * 0.4, 1),
+            "reviews": rng.integers(500, 5001, size),
+        }
+        return {name: col.tolist() for name, col in columns.items()}
+
+    uniform, randint = rng.random, rng.randint
+    count = len(base_prices)
+    if template is None:
+        template = (int(uniform() * count) for _ in range(size))
+    template = array("q", template)
+    base = array("d", (base_prices[t] * (0.8 + uniform() * 0.4) for t in template))
+    retail = array("d", (round(b * retail_multis[t] * 2) / 2 - 0.01 for b, t in zip(base, template)))
+    columns = {
+        "template": template,
+        "wholesaleCost": array("d", (round(b, 2) for b in base)),
+        "price": array("d", (round(r, 2) for r in retail)),
+        "originalPrice": array("d", (round(r * 1.6, 2) for r in retail)),
+        "margin": array("q", (round((1 - b / r) * 100) for b, r in zip(base, retail))),
+        "discount": array("q", (randint(35, 55) for _ in range(size))),
+        "rating": array("d", (round(4.5 + uniform() * 0.4, 1) for _ in range(size))),
+        "reviews": array("q", (randint(500, 5000) for _ in range(size))),
+    }
+    return {name: col.tolist() for name, col in columns.items()}
+
+
+def stream_catalog(path, catalog, new_products, indent=None):
+    """Atomically write catalog with new_products appended; returns how many were added.
+
+    catalog is the loaded products.json data; new_products may be any
+    iterable and is consumed once. The caller holds the products.json lock.
+    """
+    path = Path(path)
+    separators = (",", ":") if indent is None else (", ", ": ")
+    sep = "," if indent is None else ",\n"
+    dump = json.JSONEncoder(separators=separators).encode
+
+    added = 0
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write('{"products":[' if indent is None else '{\n"products": [\n')
+            first = True
+            for product in catalog.get("products", []):
+                f.write(dump(product) if first else sep + dump(product))
+                first = False
+            for product in new_products:
+                f.write(dump(product) if first else sep + dump(product))
+                first = False
+                added += 1
+            f.write("]")
+            for key, value in catalog.items():
+                if key != "products":
+                    f.write(f"{sep}{dump(key)}{separators[1]}{dump(value)}")
+            f.write("}" if indent is None else "\n}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return added
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Columnar Backend
+The one place the optional NumPy dependency is imported.
+
+order_frame, product_scoring and catalog_bulk work on whole columns of
+numbers. With NumPy installed (see the optional line in requirements.txt)
+they use NumPy arrays; without it np is None, and they fall back to stdlib
+array.array columns processed in plain loops, which give the same results,
+just more slowly on large inputs.
+
+Usage:
+    python columnar.py    # Show which backend is active
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BACKEND = "numpy" if np is not None else "array"
+
+
+def main():
+    version = f" {np.__version__}" if np is not None else " (install numpy for faster analytics)"
+    print(f"Columnar backend: {BACKEND}{version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Data Access
+Safe reads and writes for the shared data/ directory.
+
+GitHub Actions jobs and local cron runs can start several bots at once, and
+each of them reads, changes and rewrites files under data/. Everything here
+goes through three rules:
+
+1. Writers hold an advisory fcntl lock on <file>.lock while they write.
+2. Files are written to a temp file and renamed into place, so readers see
+   either the old or the new version, never a half-written one.
+3. A writer that loaded a file earlier can pass the version it loaded;
+   if another process saved in between, VersionConflict is raised instead
+   of silently overwriting that change. update_json() avoids conflicts
+   altogether by re-reading under the lock.
+
+A Session groups several changes into one unit of work: each file it touches
+is locked and read once, edited in memory, and written once on commit.
+Writes are compact unless pretty output is asked for. Both Session and
+update_json() hash the content they read and skip the write when nothing
+changed, so an idle run leaves files (and git) untouched.
+write_text_if_changed() does the same for rendered HTML reports.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writes are still atomic
+    fcntl = None
+
+
+class VersionConflict(Exception):
+    """The file changed on disk since the caller loaded it."""
+
+
+def lock_path(path):
+    """Lock file guarding a data file."""
+    path = Path(path)
+    return path.with_name(path.name + ".lock")
+
+
+@contextmanager
+def locked(path, shared=False):
+    """Hold an advisory lock on a data file for the duration of the block."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path(path), "a") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def file_version(path):
+    """Opaque version stamp of a file; changes on every atomic write."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def content_hash(data):
+    """Stable digest of JSON-serializable data, independent of key order and indent."""
+    text = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def atomic_write_json(path, data, indent=2):
+    """Write JSON to a temp file in the same directory, then rename it into place.
+
+    indent=None writes the compact form with no whitespace at all.
+    """
+    path = Path(path)
+    separators = (",", ":") if indent is None else None
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent, separators=separators)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_text(path, text):
+    """Write text (UTF-8) to a temp file in the same directory, then rename it into place."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_text_if_changed(path, text):
+    """Atomically write text under the file's lock unless the file already holds it.
+
+    Returns True if the file was written.
+    """
+    new = hashlib.sha256(text.encode("utf-8")).digest()
+    with locked(path):
+        try:
+            with open(path, "rb") as f:
+                if hashlib.sha256(f.read()).digest() == new:
+                    return False
+        except OSError:
+            pass
+        atomic_write_text(path, text)
+        return True
+
+
+def load_json(path, default=None):
+    """Read a JSON file; returns (data, version). Missing or corrupt files give default."""
+    path = Path(path)
+    with locked(path, shared=True):
+        version = file_version(path)
+        try:
+            with open(path, "r") as f:
+                return json.load(f), version
+        except (OSError, ValueError):
+            return default, version
+
+
+def save_json(path, data, expected_version=False, indent=2):
+    """Atomically write a JSON file under its lock; returns the new version.
+
+    Pass the version from load_json() as expected_version to refuse the write
+    if someone else saved the file in the meantime.
+    """
+    with locked(path):
+        if expected_version is not False and file_version(path) != expected_version:
+            raise VersionConflict(f"{path} changed since it was loaded")
+        atomic_write_json(path, data, indent)
+        return file_version(path)
+
+
+def update_json(path, mutate, default=None, indent=2):
+    """Locked read-modify-write; mutate(data) edits data in place.
+
+    Returns (data, result) where result is whatever mutate returned. The
+    file is only rewritten if mutate actually changed something.
+    """
+    with locked(path):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            before = content_hash(data)
+        except (OSError, ValueError):
+            data = default() if callable(default) else default
+            before = None
+        result = mutate(data)
+        if content_hash(data) != before:
+            atomic_write_json(path, data, indent)
+        return data, result
+
+
+class Session:
+    """Unit of work over data files.
+
+    load() locks a file for the rest of the session and returns its data;
+    callers edit it in place and call mark_dirty(). commit() writes every
+    dirty file once, skipping any whose content hash is unchanged.
+
+    Used as a context manager it commits on success and always releases
+    the locks. Load files in the same order everywhere.
+    """
+
+    def __init__(self, pretty=False):
+        self.indent = 2 if pretty else None
+        self._locks = ExitStack()
+        self._files = {}
+        self._hashes = {}
+        self._dirty = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.commit()
+        finally:
+            self.close()
+
+    def load(self, path, default=None):
+        """Data of a file, read once per session under an exclusive lock."""
+        path = Path(path)
+        if path not in self._files:
+            self._locks.enter_context(locked(path))
+            try:
+                with open(path, "r") as f:
+                    self._files[path] = json.load(f)
+                self._hashes[path] = content_hash(self._files[path])
+            except (OSError, ValueError):
+                self._files[path] = default() if callable(default) else default
+        return self._files[path]
+
+    def mark_dirty(self, path):
+        """Schedule a loaded file to be written on commit."""
+        self._dirty.add(Path(path))
+
+    def commit(self):
+        """Write each dirty file once; returns the paths written."""
+        written = []
+        for path in sorted(self._dirty):
+            digest = content_hash(self._files[path])
+            if digest == self._hashes.get(path):
+                continue
+            atomic_write_json(path, self._files[path], self.indent)
+            self._hashes[path] = digest
+            written.append(path)
+        self._dirty.clear()
+        return written
+
+    def close(self):
+        """Release every lock without writing."""
+        self._locks.close()
+        self._files.clear()
+        self._hashes.clear()
+        self._dirty.clear()
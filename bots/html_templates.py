@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+SellBuddy HTML Templates
+Static page shells compiled once, filled with rendered data fragments.
+
+The HTML reports are mostly fixed CSS, markup and chart scripts around a few
+tables and numbers. Each shell lives in bots/templates/<name>.html with
+{{slot}} placeholders; it is read and split into static chunks the first
+time it is used and cached for the rest of the process, so a render is one
+join over the chunks and the fragments. Since the shells are plain HTML,
+their CSS and JS need no brace escaping.
+
+Usage:
+    python html_templates.py dashboard    # List the slots of a template
+"""
+
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+_SLOT = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    """A page shell split into static chunks around named slots."""
+
+    def __init__(self, text):
+        parts = _SLOT.split(text)
+        self.chunks = parts[0::2]
+        self.slots = parts[1::2]
+
+    def render(self, **fragments):
+        """Fill every slot; a missing fragment raises KeyError."""
+        out = [self.chunks[0]]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            out.append(str(fragments[slot]))
+            out.append(chunk)
+        return "".join(out)
+
+
+@lru_cache(maxsize=None)
+def load_template(name):
+    """Compiled templates/<name>.html, cached per process."""
+    with open(TEMPLATES_DIR / f"{name}.html", "r", encoding="utf-8") as f:
+        return Template(f.read())
+
+
+def render(name, **fragments):
+    """Render a named template."""
+    return load_template(name).render(**fragments)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python html_templates.py <template>")
+        sys.exit(1)
+    for slot in dict.fromkeys(load_template(sys.argv[1]).slots):
+        print(slot)
+
+
+if __name__ == "__main__":
+    main()
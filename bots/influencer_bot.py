@@ -4,11 +4,13 @@ SellBuddy Influencer Outreach Bot
 Finds micro-influencers, generates personalized outreach, and tracks campaigns.
 """
 
-import json
 import random
 from datetime import datetime
 from pathlib import Path
 
+from data_access import load_json, save_json
+from top_k import top_k
+
 # Influencer scoring criteria
 SCORING_WEIGHTS = {
     "engagement_rate": 0.35,
@@ -21,18 +23,14 @@ SCORING_WEIGHTS = {
 def load_influencers():
     """Load influencers from JSON file."""
     path = Path(__file__).parent.parent / "data" / "influencers.json"
-    try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except:
-        return {"influencers": [], "campaigns": [], "outreachTemplates": []}
+    data, _ = load_json(path)
+    return data or {"influencers": [], "campaigns": [], "outreachTemplates": []}
 
 
 def save_influencers(data):
     """Save influencers to JSON file."""
     path = Path(__file__).parent.parent / "data" / "influencers.json"
-    with open(path, "w") as f:
-        json.dump(data, f, indent=4)
+    save_json(path, data, indent=4)
 
 
 def calculate_influencer_score(influencer):
@@ -113,9 +111,10 @@ SellBuddy Team
     return templates.get(template_type, templates["product-review"])
 
 
-def find_micro_influencers(niche, min_followers=1000, max_followers=50000):
+def find_micro_influencers(niche, min_followers=1000, max_followers=50000, limit=None):
     """
-    Find potential micro-influencers (simulated).
+    Find potential micro-influencers (simulated), best score first.
+    With a limit only the leaders are ranked, not the whole list.
     In production, integrate with social media APIs.
     """
     # Simulated influencer discovery
@@ -152,6 +151,8 @@ def find_micro_influencers(niche, min_followers=1000, max_followers=50000):
     for inf in sample_influencers:
         inf["score"] = calculate_influencer_score(inf)
 
+    if limit:
+        return top_k(sample_influencers, limit, key=lambda x: x["score"])
     sample_influencers.sort(key=lambda x: x["score"], reverse=True)
     return sample_influencers
 
@@ -223,7 +224,7 @@ def main():
     # Find influencers
     print(f"Finding micro-influencers for: {product['niche']}")
     print("-" * 30)
-    influencers = find_micro_influencers(product["niche"])
+    influencers = find_micro_influencers(product["niche"], limit=10)
 
     print(f"\nFound {len(influencers)} potential influencers:")
     print()
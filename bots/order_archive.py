@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Order Archive
+Moves closed orders out of orders.json into monthly partitions.
+
+Delivered, cancelled and refunded orders are appended to
+data/orders/<YYYY-MM>.jsonl by the month they were created, and
+data/orders/manifest.json records each partition's order count and date
+span. The live store keeps only orders that can still change, so the bots
+that load it at startup stay fast, while analytics opens only the
+partitions that overlap the date range it asks for.
+
+Usage:
+    python order_archive.py            # Archive closed orders now
+    python order_archive.py --list     # Show partitions in the manifest
+"""
+
+import os
+import json
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from data_access import atomic_write_json, locked
+from order_schema import Order
+from order_store import DATA_DIR, OrderStore
+
+# Statuses an order never leaves
+ARCHIVE_STATUSES = ("delivered", "cancelled", "refunded")
+
+
+class OrderArchive:
+    """Monthly JSONL partitions of closed orders."""
+
+    def __init__(self, data_dir=None):
+        data_dir = Path(data_dir) if data_dir else DATA_DIR
+        self.archive_dir = data_dir / "orders"
+        self.manifest_file = self.archive_dir / "manifest.json"
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"partitions": {}, "lastArchived": None}
+
+    def _partition_file(self, month):
+        return self.archive_dir / f"{month}.jsonl"
+
+    def _partition_ids(self, month):
+        """IDs already written to a partition, so a retried run never duplicates."""
+        return {o.id for o in self._read_partition(month)}
+
+    def _read_partition(self, month):
+        path = self._partition_file(month)
+        if not path.exists():
+            return
+        with open(path, "r") as f:
+            for line in f:
+                if line.endswith("\n"):
+                    yield Order.from_dict(json.loads(line))
+
+    # ----------------------------------------
+    # Archiving
+    # ----------------------------------------
+
+    def archive(self, store):
+        """Move closed orders from the store into their monthly partitions."""
+        with locked(self.manifest_file):
+            self.manifest = self._load_manifest()
+            return self._archive(store)
+
+    def _archive(self, store):
+        by_month = {}
+        for order in store.orders:
+            if order.status in ARCHIVE_STATUSES:
+                month = order.day[:7]
+                by_month.setdefault(month, []).append(order)
+
+        if not by_month:
+            return 0
+
+        self.archive_dir.mkdir(exist_ok=True)
+        partitions = self.manifest["partitions"]
+
+        for month, orders in sorted(by_month.items()):
+            written = self._partition_ids(month)
+            new_orders = [o for o in orders if o.id not in written]
+
+            with open(self._partition_file(month), "a") as f:
+                for order in new_orders:
+                    f.write(json.dumps(order.to_dict(), separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            dates = [o.day for o in orders]
+            entry = partitions.setdefault(month, {"file": self._partition_file(month).name, "orders": 0})
+            entry["orders"] = len(written) + len(new_orders)
+            entry["first"] = min([entry.get("first") or dates[0]] + dates)
+            entry["last"] = max([entry.get("last") or dates[0]] + dates)
+
+        self.manifest["lastArchived"] = datetime.now().isoformat()
+        atomic_write_json(self.manifest_file, self.manifest)
+
+        # Only drop orders from the store once the partitions and manifest are durable
+        archived = [o.id for orders in by_month.values() for o in orders]
+        store.archive(archived)
+        store.compact()
+        return len(archived)
+
+    # ----------------------------------------
+    # Reads
+    # ----------------------------------------
+
+    def rewrite(self):
+        """Rewrite every partition in the canonical order form; returns the order count."""
+        with locked(self.manifest_file):
+            return self._rewrite()
+
+    def _rewrite(self):
+        count = 0
+        for month in self.manifest["partitions"]:
+            orders = list(self._read_partition(month))
+            lines = "".join(json.dumps(o.to_dict(), separators=(",", ":")) + "\n" for o in orders)
+            path = self._partition_file(month)
+            tmp_path = path.with_suffix(".jsonl.tmp")
+            with open(tmp_path, "w") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            count += len(orders)
+        return count
+
+    def partitions_for(self, start=None, end=None):
+        """Partition months whose dates overlap [start, end] (YYYY-MM-DD, inclusive)."""
+        months = []
+        for month, entry in sorted(self.manifest["partitions"].items()):
+            first = entry.get("first", month)
+            last = entry.get("last", month)
+            if start and last < start:
+                continue
+            if end and first > end:
+                continue
+            months.append(month)
+        return months
+
+    def iter_orders(self, start=None, end=None):
+        """Yield archived orders created in [start, end], opening only matching partitions."""
+        for month in self.partitions_for(start, end):
+            for order in self._read_partition(month):
+                if start and order.day < start:
+                    continue
+                if end and order.day > end:
+                    continue
+                yield order
+
+
+def load_orders(data_dir=None, start=None, end=None, store=None):
+    """Yield live and archived orders created in [start, end].
+
+    This is the one loader bots should use for order history.
+    """
+    store = store or OrderStore(data_dir)
+    yield from OrderArchive(data_dir).iter_orders(start, end)
+    for order in store.orders:
+        day = order.day
+        if start and day < start:
+            continue
+        if end and day > end:
+            continue
+        yield order
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive closed SellBuddy orders')
+    parser.add_argument('--list', '-l', action='store_true', help='List archive partitions')
+
+    args = parser.parse_args()
+
+    archive = OrderArchive()
+    if args.list:
+        for month, entry in sorted(archive.manifest["partitions"].items()):
+            print(f"{month}: {entry['orders']} orders ({entry.get('first')} to {entry.get('last')})")
+        return
+
+    store = OrderStore()
+    count = archive.archive(store)
+    print(f"Archived {count} closed orders; {len(store.orders)} remain in {store.snapshot_file}")
+
+
+if __name__ == "__main__":
+    main()
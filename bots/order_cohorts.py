@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Order Cohorts
+Customer cohorts, retention, repeat rate and LTV from the order history.
+
+Customers are identified by a hash of their lowercased email, so the index
+never holds addresses. The first pass over the orders builds that index:
+per customer, the first order month, the order count and a bitmask of the
+months they bought in (relative to the first, capped at the months followed),
+which is enough for retention and repeat rate. A second pass adds each
+order's revenue to its customer's cohort and month offset for the LTV
+curves. Both passes stream the orders; memory is a few
+dozen bytes per customer plus the cohort matrix.
+
+Usage:
+    python order_cohorts.py               # Cohort matrix of all stored orders
+    python order_cohorts.py --months 6    # Only the first 6 months of each cohort
+"""
+
+import hashlib
+import argparse
+
+from order_archive import load_orders
+
+
+def customer_key(email):
+    """Compact, stable hash of a customer's email."""
+    return hashlib.blake2b(email.strip().lower().encode(), digest_size=8).digest()
+
+
+def month_index(day):
+    """Months since year 0 for a YYYY-MM(-DD) date."""
+    return int(day[:4]) * 12 + int(day[5:7]) - 1
+
+
+def month_label(index):
+    """YYYY-MM for a month_index()."""
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+class CohortIndex:
+    """Per-customer first month, order count and active months, keyed by email hash."""
+
+    def __init__(self, months=12):
+        self.months = months
+        self.customers = {}
+        self.skipped = 0
+
+    def add(self, order):
+        """Fold one order into its customer's entry."""
+        if not order.customer_email:
+            self.skipped += 1
+            return
+        key = customer_key(order.customer_email)
+        month = month_index(order.day)
+        entry = self.customers.get(key)
+        if entry is None:
+            self.customers[key] = [month, 1, 1]
+            return
+
+        first, orders, mask = entry
+        if month < first:
+            # Bit i means "bought i months after the first order"; re-anchor on the new first month
+            mask <<= first - month
+            first = month
+        entry[0] = first
+        entry[1] = orders + 1
+        entry[2] = (mask | (1 << (month - first))) & ((1 << self.months) - 1)
+
+    def cohort_of(self, order):
+        """First order month of an order's customer, or None."""
+        if not order.customer_email:
+            return None
+        entry = self.customers.get(customer_key(order.customer_email))
+        return entry[0] if entry else None
+
+
+def cohort_analysis(source, months=12):
+    """Cohort matrix from source, a callable returning a fresh iterable of Orders."""
+    index = CohortIndex(months)
+    for order in source():
+        index.add(order)
+
+    # Retention: active customers per cohort and month offset
+    sizes, active = {}, {}
+    repeat = 0
+    for first, orders, mask in index.customers.values():
+        sizes[first] = sizes.get(first, 0) + 1
+        repeat += orders > 1
+        row = active.setdefault(first, [0] * months)
+        for offset in range(months):
+            if not mask:
+                break
+            if mask & 1:
+                row[offset] += 1
+            mask >>= 1
+
+    # LTV: revenue per cohort and month offset
+    revenue = {first: [0.0] * months for first in sizes}
+    for order in source():
+        first = index.cohort_of(order)
+        if first is None:
+            continue
+        offset = month_index(order.day) - first
+        if offset < months:
+            revenue[first][offset] += order.revenue
+
+    cohorts = []
+    for first in sorted(sizes):
+        size = sizes[first]
+        ltv, total = [], 0.0
+        for value in revenue[first]:
+            total += value
+            ltv.append(round(total / size, 2))
+        cohorts.append({
+            "cohort": month_label(first),
+            "customers": size,
+            "retention": [round(n / size * 100, 1) for n in active[first]],
+            "ltv": ltv,
+        })
+
+    customers = len(index.customers)
+    return {
+        "customers": customers,
+        "repeat_rate": round(repeat / customers * 100, 1) if customers else 0,
+        "without_email": index.skipped,
+        "months": months,
+        "cohorts": cohorts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Customer cohort analysis')
+    parser.add_argument('--months', '-m', type=int, default=12, help='Months after the first order to follow')
+
+    args = parser.parse_args()
+
+    result = cohort_analysis(load_orders, args.months)
+    print(f"Customers: {result['customers']} | Repeat rate: {result['repeat_rate']}%"
+          f" | Orders without email: {result['without_email']}")
+    print()
+    print("Cohort    Size  " + " ".join(f"M{i:<4}" for i in range(args.months)) + " LTV")
+    for c in result["cohorts"]:
+        cells = " ".join(f"{r:<5g}" for r in c["retention"])
+        print(f"{c['cohort']}  {c['customers']:>4}  {cells} ${c['ltv'][-1]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
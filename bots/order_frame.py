@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Order Frame
+Columnar, array-backed view of orders for analytics.
+
+Orders are ingested once into parallel typed columns: quantity, revenue,
+profit and margin as numbers (margin is NaN for orders with no known
+cost), and status, product and day as integer codes into small
+label tables. Group-by-sum and filtering then work on whole columns instead
+of walking Order objects again for every metric. NumPy is used when it is
+installed; otherwise the same operations run over stdlib array.array
+columns in a single loop each.
+
+Usage:
+    python order_frame.py                      # Summarize all stored orders
+    python order_frame.py --start 2024-01-01   # Only orders created since a date
+"""
+
+import argparse
+from array import array
+from itertools import compress
+
+from columnar import BACKEND, np
+from order_schema import Order
+from order_archive import load_orders
+from quantile_sketch import margin_pct
+
+# Numeric columns and their array typecodes
+NUMERIC_COLUMNS = {"quantity": "q", "revenue": "d", "profit": "d", "margin": "d"}
+
+NAN = float("nan")
+
+# Categorical columns, stored as codes into per-frame label lists
+KEY_COLUMNS = ("status", "product", "day")
+
+
+class OrderFrame:
+    """Orders as typed columns with vectorized filter and group-by-sum."""
+
+    def __init__(self, columns, labels):
+        self.columns = columns
+        self.labels = labels
+
+    @classmethod
+    def from_orders(cls, orders):
+        """Ingest any iterable of Orders (or order dicts) in one pass."""
+        cols = {name: array(code) for name, code in NUMERIC_COLUMNS.items()}
+        cols.update({key: array("q") for key in KEY_COLUMNS})
+        codes = {key: {} for key in KEY_COLUMNS}
+
+        quantity, revenue, profit, margin = (cols[name] for name in NUMERIC_COLUMNS)
+        for order in orders:
+            if isinstance(order, dict):
+                order = Order.from_dict(order)
+            quantity.append(order.quantity or 0)
+            revenue.append(order.revenue)
+            profit.append(order.profit)
+            pct = margin_pct(order)
+            margin.append(NAN if pct is None else pct)
+            for key, value in (("status", order.status),
+                               ("product", order.product or order.product_id),
+                               ("day", order.day)):
+                table = codes[key]
+                code = table.get(value)
+                if code is None:
+                    code = table[value] = len(table)
+                cols[key].append(code)
+
+        if np is not None:
+            cols = {name: np.frombuffer(col, dtype=col.typecode) for name, col in cols.items()}
+        return cls(cols, {key: list(table) for key, table in codes.items()})
+
+    def __len__(self):
+        return len(self.columns["revenue"])
+
+    # ----------------------------------------
+    # Filtering
+    # ----------------------------------------
+
+    def where(self, key, predicate):
+        """Row mask for rows whose key label satisfies predicate."""
+        wanted = [code for code, label in enumerate(self.labels[key]) if predicate(label)]
+        col = self.columns[key]
+        if np is not None:
+            return np.isin(col, wanted)
+        wanted = set(wanted)
+        return [code in wanted for code in col]
+
+    def between(self, start=None, end=None):
+        """Row mask for orders created in [start, end] (YYYY-MM-DD, inclusive)."""
+        return self.where("day", lambda day: (not start or day >= start) and (not end or day <= end))
+
+    def filter(self, mask):
+        """New frame with only the rows where mask is true."""
+        if np is not None:
+            cols = {name: col[mask] for name, col in self.columns.items()}
+        else:
+            cols = {name: array(col.typecode, compress(col, mask)) for name, col in self.columns.items()}
+        return OrderFrame(cols, self.labels)
+
+    # ----------------------------------------
+    # Aggregation
+    # ----------------------------------------
+
+    def sum(self, column):
+        """Total of a numeric column."""
+        col = self.columns[column]
+        return float(col.sum()) if np is not None else float(sum(col))
+
+    def group_sum(self, key, column=None):
+        """{label: sum of column} per key label present; row counts when column is None."""
+        labels = self.labels[key]
+        codes = self.columns[key]
+
+        if np is not None:
+            counts = np.bincount(codes, minlength=len(labels))
+            if column is None:
+                sums = counts
+            else:
+                values = self.columns[column]
+                sums = np.bincount(codes, weights=values, minlength=len(labels))
+                if values.dtype.kind == "i":
+                    sums = sums.round().astype(values.dtype)
+            return {labels[i]: sums[i].item() for i in np.flatnonzero(counts)}
+
+        counts = [0] * len(labels)
+        for code in codes:
+            counts[code] += 1
+        if column is None:
+            sums = counts
+        else:
+            sums = [0] * len(labels)
+            for code, value in zip(codes, self.columns[column]):
+                sums[code] += value
+        return {labels[i]: sums[i] for i, n in enumerate(counts) if n}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize orders with the columnar frame')
+    parser.add_argument('--start', type=str, help='First order date (YYYY-MM-DD)')
+    parser.add_argument('--end', type=str, help='Last order date (YYYY-MM-DD)')
+
+    args = parser.parse_args()
+
+    frame = OrderFrame.from_orders(load_orders(start=args.start, end=args.end))
+    print(f"Orders: {len(frame)} ({BACKEND} columns)")
+    print(f"Revenue: ${frame.sum('revenue'):,.2f}")
+    print(f"Profit: ${frame.sum('profit'):,.2f}")
+    for status, count in sorted(frame.group_sum("status").items()):
+        print(f"  {status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
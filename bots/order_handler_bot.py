@@ -10,7 +10,6 @@ ZERO COST SETUP:
 3. Set up email notifications via Google Apps Script
 """
 
-import json
 import csv
 import smtplib
 from datetime import datetime, timedelta
@@ -20,6 +19,9 @@ from email.mime.multipart import MIMEMultipart
 import random
 import string
 
+from order_archive import load_orders
+from order_store import OrderStore
+
 # ============================================
 # CONFIGURATION
 # ============================================
@@ -297,7 +299,7 @@ def generate_shipping_notification(order):
 # ============================================
 
 def export_orders_to_csv(orders, filename="orders_export.csv"):
-    """Export orders to CSV for Google Sheets import."""
+    """Export Order records to CSV for Google Sheets import."""
     fieldnames = [
         "order_id", "created_at", "status", "customer_name", "customer_email",
         "customer_phone", "address", "city", "state", "zip", "country",
@@ -312,28 +314,30 @@ def export_orders_to_csv(orders, filename="orders_export.csv"):
         writer.writeheader()
 
         for order in orders:
-            items_str = "; ".join([f"{i['name']} x{i['quantity']}" for i in order.get("items", [])])
+            items = order.items or [{"name": order.product, "quantity": order.quantity}]
+            items_str = "; ".join([f"{i['name']} x{i['quantity']}" for i in items])
+            address = order.address or {}
 
             row = {
-                "order_id": order.get("order_id", ""),
-                "created_at": order.get("created_at", ""),
-                "status": order.get("status", ""),
-                "customer_name": order.get("customer", {}).get("name", ""),
-                "customer_email": order.get("customer", {}).get("email", ""),
-                "customer_phone": order.get("customer", {}).get("phone", ""),
-                "address": order.get("customer", {}).get("address", {}).get("line1", ""),
-                "city": order.get("customer", {}).get("address", {}).get("city", ""),
-                "state": order.get("customer", {}).get("address", {}).get("state", ""),
-                "zip": order.get("customer", {}).get("address", {}).get("zip", ""),
-                "country": order.get("customer", {}).get("address", {}).get("country", ""),
+                "order_id": order.id,
+                "created_at": order.created_at,
+                "status": order.status,
+                "customer_name": order.customer_name or "",
+                "customer_email": order.customer_email or "",
+                "customer_phone": order.customer_phone or "",
+                "address": address.get("line1", ""),
+                "city": address.get("city", ""),
+                "state": address.get("state", ""),
+                "zip": address.get("zip", ""),
+                "country": address.get("country", ""),
                 "items": items_str,
-                "subtotal": order.get("subtotal", 0),
-                "shipping": order.get("shipping", 0),
-                "total": order.get("total", 0),
-                "payment_method": order.get("payment", {}).get("method", ""),
-                "transaction_id": order.get("payment", {}).get("transaction_id", ""),
-                "tracking_number": order.get("fulfillment", {}).get("tracking_number", ""),
-                "shipped_at": order.get("fulfillment", {}).get("shipped_at", "")
+                "subtotal": order.extra.get("subtotal", order.total),
+                "shipping": order.extra.get("shipping", 0),
+                "total": order.total,
+                "payment_method": order.payment_method or "",
+                "transaction_id": order.transaction_id or "",
+                "tracking_number": order.tracking or "",
+                "shipped_at": order.shipped_at or ""
             }
             writer.writerow(row)
 
@@ -569,24 +573,15 @@ def simulate_order_flow():
 
     # 8. Save order
     print("\n8. Saving order...")
-    orders_path = Path(__file__).parent.parent / "data" / "orders.json"
-
-    try:
-        with open(orders_path, "r") as f:
-            orders_data = json.load(f)
-    except:
-        orders_data = {"orders": []}
-
-    orders_data["orders"].append(order)
-
-    with open(orders_path, "w") as f:
-        json.dump(orders_data, f, indent=2)
+    data_dir = Path(__file__).parent.parent / "data"
+    store = OrderStore(data_dir)
+    store.add(order)
 
-    print(f"   Saved to: {orders_path}")
+    print(f"   Saved to: {store.journal_file}")
 
     # 9. Export to CSV
     print("\n9. Exporting to CSV...")
-    export_orders_to_csv(orders_data["orders"])
+    export_orders_to_csv(load_orders(data_dir, store=store))  # Archived months too
 
     print("\n" + "=" * 60)
     print("Order flow simulation complete!")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Order Metrics
+Single-pass, bounded-memory order metrics from any order stream.
+
+MetricsAggregator consumes orders one at a time, from a generator over a
+JSONL file, a CSV export or the order store, and keeps only running totals:
+order count, revenue and profit, orders per status, units and revenue per
+product, revenue per day, and quantile sketches of order value and margin.
+Memory grows with the number of products and days seen, never with the
+number of orders, so a year of history can be summarized without loading it.
+With max_products set, products are tracked as Space-Saving heavy hitters
+instead, so even an unbounded catalog stays within a fixed number of counters.
+
+Usage:
+    python order_metrics.py data/orders/2024-06.jsonl       # Summarize a partition
+    python order_metrics.py data/orders_export.csv          # Summarize a CSV export
+    python order_metrics.py data/orders/*.jsonl --days 30   # Several files, 30-day series
+"""
+
+import csv
+import json
+import argparse
+from datetime import datetime, timedelta
+
+from order_schema import Order
+from quantile_sketch import KLLSketch, margin_pct
+from top_k import SpaceSaving, top_k
+
+
+def iter_jsonl(path):
+    """Yield Orders from a JSONL file of order records or order journal records.
+
+    Journal "add" records yield the order as it was created; later "update"
+    and "archive" records are skipped, since following them would mean
+    remembering every order. Use order_archive.load_orders() for live status.
+    """
+    with open(path, "r") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # Torn final line
+            record = json.loads(line)
+            if "op" in record:
+                if record["op"] != "add":
+                    continue
+                record = record["order"]
+            yield Order.from_dict(record)
+
+
+def iter_csv(path):
+    """Yield Orders from an order_handler_bot CSV export."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            items = []
+            for part in filter(None, (row.get("items") or "").split("; ")):
+                name, _, quantity = part.rpartition(" x")
+                items.append({"name": name, "quantity": int(quantity) if quantity.isdigit() else 1})
+
+            yield Order(
+                id=row["order_id"],
+                created_at=row["created_at"],
+                status=row.get("status") or "pending",
+                product=items[0]["name"] if items else None,
+                quantity=sum(i["quantity"] for i in items) or 1,
+                total=float(row.get("total") or 0),
+                customer_email=row.get("customer_email") or None,
+            )
+
+
+def stream_orders(path):
+    """Yield Orders from a .jsonl or .csv file."""
+    path = str(path)
+    return iter_csv(path) if path.endswith(".csv") else iter_jsonl(path)
+
+
+class MetricsAggregator:
+    """Running totals over a stream of orders."""
+
+    def __init__(self, max_products=None):
+        self.orders = 0
+        self.revenue = 0.0
+        self.profit = 0.0
+        self.status_counts = {}
+        self.products = {}
+        self.product_revenue = SpaceSaving(max_products) if max_products else None
+        self.product_units = SpaceSaving(max_products) if max_products else None
+        self.daily = {}
+        self.value_sketch = KLLSketch()
+        self.margin_sketch = KLLSketch()
+
+    def add(self, order):
+        """Fold one order into the totals."""
+        revenue = order.revenue
+        self.orders += 1
+        self.revenue += revenue
+        self.profit += order.profit
+        self.status_counts[order.status] = self.status_counts.get(order.status, 0) + 1
+
+        name = order.product or order.product_id
+        if self.product_revenue is not None:
+            self.product_revenue.add(name, revenue)
+            self.product_units.add(name, order.quantity or 0)
+        else:
+            sales = self.products.get(name)
+            if sales is None:
+                sales = self.products[name] = {"units": 0, "revenue": 0.0}
+            sales["units"] += order.quantity or 0
+            sales["revenue"] += revenue
+
+        day = order.day
+        self.daily[day] = self.daily.get(day, 0.0) + revenue
+
+        self.value_sketch.update(revenue)
+        margin = margin_pct(order)
+        if margin is not None:
+            self.margin_sketch.update(margin)
+
+    def consume(self, orders):
+        """Fold every order from an iterable; returns self."""
+        add = self.add
+        for order in orders:
+            add(order)
+        return self
+
+    def metrics(self, days=7, top=5):
+        """Metrics in the analytics_dashboard.calculate_metrics shape."""
+        today = datetime.now()
+        window = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days - 1, -1, -1)]
+
+        if self.product_revenue is not None:
+            units = self.product_units.counts
+            top_products = [{"name": k, "units": units.get(k, 0), "revenue": round(v, 2)}
+                            for k, v, _ in self.product_revenue.top(top)]
+        else:
+            top_products = top_k(
+                ({"name": k, "units": v["units"], "revenue": round(v["revenue"], 2)} for k, v in self.products.items()),
+                top, key=lambda x: x["revenue"]
+            )
+
+        return {
+            "total_orders": self.orders,
+            "total_revenue": round(self.revenue, 2),
+            "total_profit": round(self.profit, 2),
+            "avg_order_value": round(self.revenue / self.orders, 2) if self.orders else 0,
+            "profit_margin": round((self.profit / self.revenue) * 100, 1) if self.revenue > 0 else 0,
+            "orders_by_status": dict(self.status_counts),
+            "top_products": top_products,
+            "daily_revenue": [{"date": d, "revenue": round(self.daily.get(d, 0), 2)} for d in window] if self.orders else [],
+            "order_value_pctl": self.value_sketch.quantiles(),
+            "margin_pctl": self.margin_sketch.quantiles()
+        }
+
+    def daily_series(self):
+        """Revenue per day for every day seen, oldest first."""
+        return [{"date": d, "revenue": round(v, 2)} for d, v in sorted(self.daily.items())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize order files in one streaming pass')
+    parser.add_argument('files', nargs='+', help='Order .jsonl or .csv files')
+    parser.add_argument('--days', '-d', type=int, default=7, help='Days of daily revenue to show')
+    parser.add_argument('--max-products', type=int, help='Track at most this many products (heavy hitters)')
+
+    args = parser.parse_args()
+
+    agg = MetricsAggregator(args.max_products)
+    for path in args.files:
+        agg.consume(stream_orders(path))
+
+    metrics = agg.metrics(days=args.days)
+    print(f"Orders: {metrics['total_orders']}")
+    print(f"Revenue: ${metrics['total_revenue']:,.2f}")
+    print(f"Profit: ${metrics['total_profit']:,.2f}")
+    print(f"Avg Order Value: ${metrics['avg_order_value']:.2f}")
+    for status, count in sorted(metrics["orders_by_status"].items()):
+        print(f"  {status}: {count}")
+    print("Top products:")
+    for p in metrics["top_products"]:
+        print(f"  {p['name']}: {p['units']} units (${p['revenue']:.2f})")
+    print("Daily revenue:")
+    for d in metrics["daily_revenue"]:
+        print(f"  {d['date']}: ${d['revenue']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Order Repository
+Indexed SQLite view of the order store (data/orders.db).
+
+The journaled OrderStore stays the source of truth; this repository mirrors it
+into a table with indexes on status, created date and product_id so stats,
+fulfillment passes and the dashboard can query instead of walking every order.
+It catches up from the journal tail on each sync and falls back to a full
+import (archive partitions plus live orders) when it has fallen behind a
+compaction. Archived orders keep their rows, so queries still see all history.
+
+Triggers on the orders table keep daily_rollups (one row per day, product and
+status with order, unit, revenue, cost and profit sums) current as rows are
+written, so the totals and chart queries read rollups sized by the days shown
+rather than by the number of orders ever placed. Orders with unknown cost are
+stored with a NULL cost: they add to neither the cost nor the profit sums,
+the same way Order.profit and margin_pct() treat them.
+
+order_sketches holds a KLL quantile sketch of order value and of margin per
+day and product. New orders are folded in as they sync, and quantiles() merges
+the sketches for a window to give p50/p90/p99 without reading any orders.
+
+Usage:
+    python order_repository.py import              # One-time import of orders.json
+    python order_repository.py import --file PATH  # Import another orders file
+"""
+
+import json
+import sqlite3
+import argparse
+from itertools import chain
+from pathlib import Path
+
+from order_schema import Order
+from quantile_sketch import KLLSketch, margin_pct
+from order_store import DATA_DIR, OrderStore
+from order_archive import OrderArchive
+
+# Bumped whenever the table layout or how rows are derived changes; older databases are rebuilt
+# (5: margin sketches skip orders with unknown cost; 6: NULL cost and a profit rollup)
+SCHEMA_VERSION = 6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    status TEXT,
+    created_at TEXT,
+    product_id TEXT,
+    product TEXT,
+    quantity INTEGER,
+    total REAL,
+    cost REAL,
+    doc TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status);
+CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at);
+CREATE INDEX IF NOT EXISTS idx_orders_product ON orders (product_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day TEXT,
+    product TEXT,
+    status TEXT,
+    orders INTEGER,
+    units INTEGER,
+    revenue REAL,
+    cost REAL,
+    profit REAL,
+    PRIMARY KEY (day, product, status)
+);
+CREATE TABLE IF NOT EXISTS order_sketches (
+    day TEXT,
+    product TEXT,
+    metric TEXT,
+    sketch TEXT,
+    PRIMARY KEY (day, product, metric)
+);
+CREATE TRIGGER IF NOT EXISTS rollup_insert AFTER INSERT ON orders BEGIN
+    INSERT INTO daily_rollups (day, product, status, orders, units, revenue, cost, profit)
+    VALUES (substr(NEW.created_at, 1, 10), COALESCE(NEW.product, NEW.product_id, ''), NEW.status,
+            1, NEW.quantity, NEW.total, COALESCE(NEW.cost, 0), COALESCE(NEW.total - NEW.cost, 0))
+    ON CONFLICT (day, product, status) DO UPDATE SET
+        orders = orders + 1,
+        units = units + excluded.units,
+        revenue = revenue + excluded.revenue,
+        cost = cost + excluded.cost,
+        profit = profit + excluded.profit;
+END;
+CREATE TRIGGER IF NOT EXISTS rollup_delete AFTER DELETE ON orders BEGIN
+    UPDATE daily_rollups SET
+        orders = orders - 1,
+        units = units - OLD.quantity,
+        revenue = revenue - OLD.total,
+        cost = cost - COALESCE(OLD.cost, 0),
+        profit = profit - COALESCE(OLD.total - OLD.cost, 0)
+    WHERE day = substr(OLD.created_at, 1, 10)
+      AND product = COALESCE(OLD.product, OLD.product_id, '')
+      AND status = OLD.status;
+    DELETE FROM daily_rollups WHERE orders <= 0
+      AND day = substr(OLD.created_at, 1, 10)
+      AND product = COALESCE(OLD.product, OLD.product_id, '')
+      AND status = OLD.status;
+END;
+"""
+
+
+def _order_row(order):
+    """Flatten an Order into a table row."""
+    return (
+        order.id,
+        order.status,
+        order.created_at,
+        order.product_id,
+        order.product,
+        order.quantity,
+        order.total,
+        order.cost,
+        json.dumps(order.to_dict(), separators=(",", ":")),
+    )
+
+
+class OrderRepository:
+    """SQLite-backed order queries."""
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else DATA_DIR / "orders.db"
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        # INSERT OR REPLACE only fires the rollup delete trigger with this on
+        self.conn.execute("PRAGMA recursive_triggers = ON")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript(
+                "DROP TABLE IF EXISTS orders; DROP TABLE IF EXISTS meta; "
+                "DROP TABLE IF EXISTS daily_rollups; DROP TABLE IF EXISTS order_sketches;"
+            )
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    # ----------------------------------------
+    # Loading
+    # ----------------------------------------
+
+    def _get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def _set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    def upsert(self, orders):
+        """Insert or replace orders by ID."""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (_order_row(o) for o in orders)
+        )
+
+    def _sketched(self, orders):
+        """Yield orders while folding them into their day/product sketches, saved at the end."""
+        sketches = {}
+        for order in orders:
+            key = (order.day, order.product or order.product_id or "")
+            if key not in sketches:
+                sketches[key] = self._load_sketches(*key)
+            sketches[key]["value"].update(order.total)
+            margin = margin_pct(order)
+            if margin is not None:
+                sketches[key]["margin"].update(margin)
+            yield order
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO order_sketches VALUES (?, ?, ?, ?)",
+            ((day, product, metric, json.dumps(sketch.to_dict(), separators=(",", ":")))
+             for (day, product), by_metric in sketches.items()
+             for metric, sketch in by_metric.items())
+        )
+
+    def _load_sketches(self, day, product):
+        rows = self.conn.execute(
+            "SELECT metric, sketch FROM order_sketches WHERE day = ? AND product = ?", (day, product)
+        )
+        sketches = {"value": KLLSketch(), "margin": KLLSketch()}
+        sketches.update({row["metric"]: KLLSketch.from_dict(json.loads(row["sketch"])) for row in rows})
+        return sketches
+
+    def import_orders(self, orders, seq=0):
+        """Replace the table contents with the given orders."""
+        with self.conn:
+            self.conn.execute("DELETE FROM orders")
+            self.conn.execute("DELETE FROM daily_rollups")  # Clears float dust left by unwinding
+            self.conn.execute("DELETE FROM order_sketches")
+            self.upsert(self._sketched(orders))
+            self._set_meta("journal_seq", seq)
+        return self.count()
+
+    def import_json(self, path):
+        """One-time import of an orders.json file."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        records = data.get("orders", []) if isinstance(data, dict) else data
+        orders = (Order.from_dict(r) for r in records)
+        return self.import_orders(orders, data.get("journalSeq", 0) if isinstance(data, dict) else 0)
+
+    def sync(self, store):
+        """Bring the table up to date with an OrderStore; returns rows written."""
+        seq = int(self._get_meta("journal_seq", -1))
+        if seq == store.seq:
+            return 0
+
+        if seq < store.base_seq or seq > store.seq:
+            # The journal records we need were compacted away (or the store was reset)
+            archived = OrderArchive(store.data_dir).iter_orders()
+            return self.import_orders(chain(archived, store.orders), store.seq)
+
+        touched = {}
+        for record in store.journal_since(seq):
+            if record["op"] == "archive":
+                continue  # Rows for archived orders stay as they were
+            key = record["id"] if record["op"] == "update" else record["order"]["id"]
+            touched[key] = store.get(key)
+
+        orders = [o for o in touched.values() if o is not None]
+        known = [o for o in orders if self.conn.execute("SELECT 1 FROM orders WHERE id = ?", (o.id,)).fetchone()]
+        known_ids = {o.id for o in known}
+
+        with self.conn:
+            # Only new orders go into the sketches; status changes leave value and margin alone
+            self.upsert(self._sketched(o for o in orders if o.id not in known_ids))
+            self.upsert(known)
+            self._set_meta("journal_seq", store.seq)
+        return len(touched)
+
+    # ----------------------------------------
+    # Queries
+    # ----------------------------------------
+
+    def count(self):
+        """Total number of orders."""
+        return self.conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def status_counts(self):
+        """Orders per status."""
+        rows = self.conn.execute(
+            "SELECT status, SUM(orders) AS n FROM daily_rollups GROUP BY status"
+        )
+        return {row["status"]: row["n"] for row in rows}
+
+    def ids_with_status(self, *statuses):
+        """IDs of orders in any of the given statuses, oldest first."""
+        marks = ", ".join("?" for _ in statuses)
+        rows = self.conn.execute(
+            f"SELECT id FROM orders WHERE status IN ({marks}) ORDER BY created_at", statuses
+        )
+        return [row["id"] for row in rows]
+
+    def totals(self):
+        """Order count, revenue, known cost and profit."""
+        row = self.conn.execute(
+            """SELECT COALESCE(SUM(orders), 0) AS n, COALESCE(SUM(revenue), 0) AS revenue,
+                      COALESCE(SUM(cost), 0) AS cost, COALESCE(SUM(profit), 0) AS profit
+               FROM daily_rollups"""
+        ).fetchone()
+        return {"orders": row["n"], "revenue": round(row["revenue"], 2),
+                "cost": round(row["cost"], 2), "profit": round(row["profit"], 2)}
+
+    def product_sales(self, limit=5):
+        """Best-selling products by revenue."""
+        rows = self.conn.execute(
+            """SELECT product AS name, SUM(units) AS units, SUM(revenue) AS revenue
+               FROM daily_rollups GROUP BY product
+               ORDER BY revenue DESC LIMIT ?""",
+            (limit,)
+        )
+        return [{"name": r["name"], "units": r["units"], "revenue": round(r["revenue"], 2)} for r in rows]
+
+    def daily_revenue(self, start, end):
+        """Revenue per day for created dates in [start, end] (YYYY-MM-DD)."""
+        rows = self.conn.execute(
+            """SELECT day, SUM(revenue) AS revenue
+               FROM daily_rollups WHERE day >= ? AND day <= ?
+               GROUP BY day""",
+            (start, end)
+        )
+        return {r["day"]: round(r["revenue"], 2) for r in rows}
+
+    def quantiles(self, metric="value", start=None, end=None, product=None, qs=(0.5, 0.9, 0.99)):
+        """Approximate quantiles of order value or margin for days in [start, end]."""
+        query = "SELECT sketch FROM order_sketches WHERE metric = ? AND day >= ? AND day <= ?"
+        params = [metric, start or "", end or "~"]
+        if product is not None:
+            query += " AND product = ?"
+            params.append(product)
+
+        merged = KLLSketch()
+        for row in self.conn.execute(query, params):
+            merged.merge(KLLSketch.from_dict(json.loads(row["sketch"])))
+        return merged.quantiles(qs)
+
+    def rollups(self, start=None, end=None):
+        """Rollup rows (day, product, status, orders, units, revenue, cost, profit) for days in [start, end]."""
+        rows = self.conn.execute(
+            """SELECT day, product, status, orders, units, ROUND(revenue, 2) AS revenue, ROUND(cost, 2) AS cost,
+                      ROUND(profit, 2) AS profit
+               FROM daily_rollups WHERE day >= ? AND day <= ?
+               ORDER BY day, product, status""",
+            (start or "", end or "~")
+        )
+        return [dict(r) for r in rows]
+
+
+def open_repository(data_dir=None, store=None):
+    """Open the repository and sync it with the order store."""
+    data_dir = Path(data_dir) if data_dir else DATA_DIR
+    store = store or OrderStore(data_dir)
+    repo = OrderRepository(data_dir / "orders.db")
+    repo.sync(store)
+    return repo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SellBuddy order repository')
+    parser.add_argument('task', choices=['import'], help='Task to run')
+    parser.add_argument('--file', '-f', type=str, help='Orders JSON file to import')
+
+    args = parser.parse_args()
+
+    repo = OrderRepository()
+    if args.file:
+        count = repo.import_json(args.file)
+    else:
+        store = OrderStore()
+        archived = OrderArchive(store.data_dir).iter_orders()
+        count = repo.import_orders(chain(archived, store.orders), store.seq)
+    print(f"Imported {count} orders into {repo.db_path}")
+    repo.close()
+
+
+if __name__ == "__main__":
+    main()
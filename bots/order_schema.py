@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Order Schema
+One canonical order record shared by every bot.
+
+Orders used to be written in several shapes: the controller's flat
+id/product/total, order_handler_bot's nested order_id/customer/items, the
+simulator's id/date/customer and the dashboard's revenue/cost/profit sample
+rows. Order is a slotted dataclass holding the union of what those shapes
+carry; from_dict() reads any of them, and to_dict() writes the compact
+canonical form (tagged with "v") that the fast path loads without remapping.
+
+Usage:
+    python order_schema.py migrate    # Rewrite orders.json, the journal and archive partitions
+    python order_schema.py check      # Validate every stored order
+"""
+
+import sys
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+
+SCHEMA_VERSION = 1
+
+
+@dataclass(slots=True)
+class Order:
+    """A single customer order."""
+
+    id: str
+    created_at: str
+    status: str = "pending"
+    product_id: str = None
+    product: str = None
+    quantity: int = 1
+    price: float = None
+    total: float = 0.0
+    cost: float = None
+    customer_name: str = None
+    customer_email: str = None
+    customer_phone: str = None
+    address: dict = None
+    items: list = None
+    payment_method: str = None
+    transaction_id: str = None
+    tracking: str = None
+    carrier: str = None
+    processed_at: str = None
+    shipped_at: str = None
+    simulated: bool = False
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def day(self):
+        """Creation date as YYYY-MM-DD."""
+        return self.created_at[:10]
+
+    @property
+    def revenue(self):
+        """Order total; the name analytics uses."""
+        return self.total
+
+    @property
+    def profit(self):
+        """Total minus cost; orders with unknown cost count no profit."""
+        return round(self.total - self.cost, 2) if self.cost is not None else 0
+
+    def update(self, changes):
+        """Apply field changes; names outside the schema go to extra."""
+        for name, value in changes.items():
+            if name in ORDER_FIELDS:
+                setattr(self, name, value)
+            else:
+                self.extra[name] = value
+
+    def to_dict(self):
+        """Compact canonical form: unset fields are left out."""
+        data = {"v": SCHEMA_VERSION}
+        for name in ORDER_FIELDS:
+            value = getattr(self, name)
+            if value is None or value == _DEFAULTS.get(name):
+                continue
+            data[name] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build an Order from the canonical form or any legacy shape."""
+        if data.get("v") == SCHEMA_VERSION:
+            try:
+                order = cls(**{k: v for k, v in data.items() if k != "v"})
+            except TypeError as e:
+                raise ValueError(f"Invalid order record {data.get('id')!r}: {e}") from None
+        else:
+            order = _from_legacy(data)
+
+        if not isinstance(order.id, str) or not order.id:
+            raise ValueError(f"Order without an ID: {data!r:.80}")
+        if not isinstance(order.total, (int, float)):
+            raise ValueError(f"Order {order.id} has a non-numeric total: {order.total!r}")
+        return order
+
+
+ORDER_FIELDS = tuple(f.name for f in fields(Order))
+_DEFAULTS = {"status": "pending", "quantity": 1, "total": 0.0, "simulated": False, "extra": {}}
+
+
+def _iso(timestamp):
+    """Normalize 'YYYY-MM-DD HH:MM:SS' and ISO timestamps to ISO."""
+    return (timestamp or "").replace(" ", "T")
+
+
+def _from_legacy(data):
+    """Map the pre-schema order shapes onto Order."""
+    data = dict(data)
+    order_id = data.pop("id", None) or data.pop("order_id", None)
+    created_at = _iso(data.pop("created_at", None) or data.pop("date", None))
+
+    customer = data.pop("customer", None)
+    if isinstance(customer, dict):
+        # order_handler_bot.create_order
+        name = customer.get("name")
+        email = customer.get("email")
+        phone = customer.get("phone")
+        address = customer.get("address")
+    else:
+        # order_simulator / autonomous_controller
+        name = customer
+        email = data.pop("email", None)
+        phone = data.pop("phone", None)
+        address = data.pop("address", None)
+    if isinstance(address, str):
+        address = {"line1": address}
+    # Unversioned dicts may already use the canonical names (hand-built or webhook orders)
+    name = data.pop("customer_name", None) or name
+    email = data.pop("customer_email", None) or email
+    phone = data.pop("customer_phone", None) or phone
+
+    items = data.pop("items", None)
+    if not isinstance(items, list):
+        items = None
+    first_item = items[0] if items else {}
+
+    payment = data.pop("payment", None) or {}
+    fulfillment = data.pop("fulfillment", None) or {}
+
+    quantity = data.pop("quantity", None) or sum(i.get("quantity", 0) for i in items or []) or 1
+    total = data.pop("total", None)
+    if total is None:
+        total = data.pop("revenue", 0)  # analytics sample rows
+    data.pop("revenue", None)
+    data.pop("profit", None)
+
+    order = Order(
+        id=order_id,
+        created_at=created_at or datetime.now().isoformat(),
+        status=data.pop("status", None) or "pending",
+        product_id=data.pop("product_id", None) or first_item.get("id") or first_item.get("sku"),
+        product=data.pop("product", None) or first_item.get("name"),
+        quantity=quantity,
+        price=data.pop("price", None),
+        total=round(total, 2),
+        cost=data.pop("cost", None),
+        customer_name=name,
+        customer_email=email,
+        customer_phone=phone,
+        address=address,
+        items=items,
+        payment_method=data.pop("payment_method", None) or payment.pop("method", None),
+        transaction_id=data.pop("transaction_id", None) or payment.pop("transaction_id", None),
+        tracking=data.pop("tracking", None) or fulfillment.pop("tracking_number", None),
+        carrier=data.pop("carrier", None) or fulfillment.pop("carrier", None),
+        processed_at=data.pop("processed_at", None),
+        shipped_at=data.pop("shipped_at", None) or fulfillment.pop("shipped_at", None),
+        simulated=bool(data.pop("simulated", False)),
+    )
+
+    # Whatever has no column of its own (status history, subtotal, supplier IDs...)
+    extra = {k: v for k, v in data.items() if v is not None}
+    extra.update({f"payment_{k}": v for k, v in payment.items() if v is not None})
+    extra.update({k: v for k, v in fulfillment.items() if v is not None})
+    order.extra = extra
+    return order
+
+
+def migrate(data_dir=None):
+    """Rewrite every stored order in the canonical form; returns the order count."""
+    from order_store import OrderStore
+    from order_archive import OrderArchive, load_orders
+    from order_repository import OrderRepository
+
+    # Loading converts legacy records; compacting writes them back canonical
+    store = OrderStore(data_dir)
+    store.rebuild()
+
+    archive = OrderArchive(store.data_dir)
+    archived = archive.rewrite()
+
+    # Force the SQLite mirror to re-import from the migrated files
+    repo = OrderRepository(store.data_dir / "orders.db")
+    repo.import_orders(load_orders(store.data_dir), store.seq)
+    repo.close()
+
+    return len(store.orders) + archived
+
+
+def main():
+    """Command line entry point."""
+    task = sys.argv[1] if len(sys.argv) > 1 else "check"
+
+    if task == "migrate":
+        count = migrate()
+        print(f"Migrated {count} orders to schema v{SCHEMA_VERSION}")
+    elif task == "check":
+        from order_archive import load_orders
+        count = sum(1 for _ in load_orders())
+        print(f"All {count} orders are valid")
+    else:
+        print(f"Unknown task: {task}")
+        print("Usage: python order_schema.py [migrate|check]")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,9 @@ import requests
 from datetime import datetime
 from pathlib import Path
 
+from order_schema import Order
+from order_store import OrderStore
+
 # Sample data for simulation
 SAMPLE_CUSTOMERS = [
     {"name": "John Smith", "email": "john.smith@example.com", "phone": "+1-555-0101"},
@@ -117,32 +120,21 @@ def generate_order():
     return order
 
 
-def save_order_locally(order):
-    """Save order to local JSON file"""
-    orders_file = PROJECT_ROOT / "data" / "orders.json"
-
-    orders = {"orders": [], "stats": {"revenue": 0, "orders_count": 0}}
-    if orders_file.exists():
-        with open(orders_file, 'r') as f:
-            orders = json.load(f)
-
-    orders["orders"].append({
-        "id": order["order_id"],
-        "date": order["date"],
-        "customer": order["customer_name"],
-        "email": order["customer_email"],
-        "product": order["items"].split(',')[0] if order["items"] else "Unknown",
-        "quantity": 1,
-        "total": order["total"],
-        "status": order["status"]
-    })
-
-    orders["stats"]["revenue"] += order["total"]
-    orders["stats"]["orders_count"] += 1
-    orders["stats"]["last_order"] = order["date"]
-
-    with open(orders_file, 'w') as f:
-        json.dump(orders, f, indent=2)
+def save_order_locally(order, store=None):
+    """Append order to the local order journal"""
+    store = store or OrderStore(PROJECT_ROOT / "data")
+    store.add(Order(
+        id=order["order_id"],
+        created_at=order["date"].replace(" ", "T"),
+        status=order["status"],
+        product=order["items"].split(',')[0] if order["items"] else "Unknown",
+        total=order["total"],
+        customer_name=order["customer_name"],
+        customer_email=order["customer_email"],
+        customer_phone=order["phone"],
+        address={"line1": order["shipping_address"]},
+        simulated=True
+    ))
 
     return True
 
@@ -164,6 +156,7 @@ def send_to_webhook(order, webhook_url):
 def simulate_orders(count=1, webhook_url=None, verbose=True):
     """Simulate multiple orders"""
     results = []
+    store = OrderStore(PROJECT_ROOT / "data")
 
     for i in range(count):
         order = generate_order()
@@ -178,9 +171,9 @@ def simulate_orders(count=1, webhook_url=None, verbose=True):
             print(f"Address: {order['shipping_address']}")
 
         # Save locally
-        save_order_locally(order)
+        save_order_locally(order, store)
         if verbose:
-            print("✅ Saved to local orders.json")
+            print("✅ Saved to local order journal")
 
         # Send to webhook if provided
         if webhook_url:
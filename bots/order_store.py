@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Order Store
+Journaled storage for data/orders.json.
+
+Every order mutation is appended as one JSON line to data/orders.journal.jsonl,
+so a write costs the same whether the store holds 100 orders or 1M. Once the
+journal grows past COMPACT_EVERY records it is folded into a new orders.json
+snapshot, which is written to a temp file and renamed into place so a crash
+can never leave a truncated store behind.
+
+The snapshot's stats and statusCounts blocks are kept current on every
+mutation, so reading them never needs a pass over the order history. The
+same goes for activeOrderIds, the orders fulfillment can still move, so the
+hourly job never touches shipped or closed orders. If orders.json was
+changed without the journal (the order count no longer matches
+totalOrders), the counters are recounted on load.
+
+Writers hold the data_access lock on orders.json while they append or
+compact, and first catch up on records other processes appended, so bots
+running in parallel never lose each other's orders. Changes made inside
+store.batch() are group-committed with a single journal write and fsync.
+
+Orders are held in memory as order_schema.Order records and written in the
+compact canonical form; legacy shapes are converted as they are loaded.
+orders.json is committed, so it is indented by default for readable diffs;
+the journal is always one compact record per line.
+
+Closed orders can be moved out to monthly partitions by order_archive.py;
+the counters keep including them through the snapshot's "archived" totals.
+
+Usage:
+    python order_store.py compact    # Fold the journal into orders.json now
+    python order_store.py compact --compact  # Same, without indentation
+    python order_store.py info       # Show snapshot and journal sizes
+    python order_store.py verify     # Recount stats from scratch and report drift
+    python order_store.py rebuild    # Recount stats from scratch and save them
+"""
+
+import os
+import sys
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from data_access import atomic_write_json, file_version, locked
+from order_schema import Order
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Journal records folded into the snapshot per compaction
+COMPACT_EVERY = 500
+
+# Bumped when the meaning of the counters or indexes changes; older snapshots are recounted
+COUNTERS_VERSION = 2
+
+# Statuses fulfillment can still move an order out of
+OPEN_STATUSES = ("pending", "paid", "confirmed", "processing")
+
+
+def empty_snapshot():
+    """Return an empty orders.json document."""
+    return {
+        "orders": [],
+        "stats": {
+            "totalOrders": 0,
+            "totalRevenue": 0,
+            "totalProfit": 0,
+            "averageOrderValue": 0,
+            "conversionRate": 0
+        },
+        "statusCounts": {
+            "pending": 0,
+            "processing": 0,
+            "shipped": 0,
+            "delivered": 0,
+            "cancelled": 0,
+            "refunded": 0
+        },
+        "lastUpdated": None
+    }
+
+
+class OrderStore:
+    """Order snapshot plus append-only mutation journal."""
+
+    def __init__(self, data_dir=None, compact_every=COMPACT_EVERY, pretty=True):
+        self.data_dir = Path(data_dir) if data_dir else DATA_DIR
+        self.snapshot_file = self.data_dir / "orders.json"
+        self.journal_file = self.data_dir / "orders.journal.jsonl"
+        self.compact_every = compact_every
+        self.indent = 2 if pretty else None
+
+        self.data = None
+        self._orders = {}
+        self._active = {}
+        self._seq = 0
+        self._pending = 0
+        self._journal_offset = 0
+        self._snapshot_version = None
+        self._batch = None
+        self.load()
+
+    # ----------------------------------------
+    # Loading
+    # ----------------------------------------
+
+    def load(self):
+        """Load the snapshot and replay any journal records written after it."""
+        with locked(self.snapshot_file, shared=True):
+            self._load()
+
+    def _load(self):
+        self._snapshot_version = file_version(self.snapshot_file)
+        try:
+            with open(self.snapshot_file, "r") as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = empty_snapshot()
+
+        self.data.setdefault("stats", empty_snapshot()["stats"])
+        self.data.setdefault("statusCounts", empty_snapshot()["statusCounts"])
+        orders = (Order.from_dict(o) for o in self.data.pop("orders", []))
+        self._orders = {o.id: o for o in orders}
+        self._active = dict.fromkeys(self.data.get("activeOrderIds", []))
+        self._seq = self.data.get("journalSeq", 0)
+        self._pending = 0
+        self._journal_offset = 0
+        self._replay_journal()
+
+        if self.data.get("countersVersion") != COUNTERS_VERSION or not self._counters_match():
+            # Written before counters were maintained, or orders.json was changed
+            # without the journal; recount once, saved on next compaction
+            self._set_counters(*self.recount())
+
+    def _replay_journal(self):
+        """Apply journal records past the current read offset."""
+        for record, end_offset in self._read_journal(self._journal_offset):
+            self._journal_offset = end_offset
+            if record["seq"] <= self._seq:
+                continue  # Already folded in by a compaction that crashed before truncating
+            self._apply(record)
+            self._seq = record["seq"]
+            self._pending += 1
+
+    def _read_journal(self, offset=0):
+        """Yield (record, end offset) pairs, stopping at a torn final line."""
+        if not self.journal_file.exists():
+            return
+
+        with open(self.journal_file, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                offset += len(line)
+                yield record, offset
+
+    def _catch_up(self):
+        """Pick up changes other processes made; the caller holds the write lock."""
+        if file_version(self.snapshot_file) != self._snapshot_version:
+            self._load()  # Someone compacted since we loaded
+        else:
+            self._replay_journal()
+
+        # Only a crashed writer leaves bytes past the last complete record
+        if self.journal_file.exists() and self.journal_file.stat().st_size > self._journal_offset:
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(self._journal_offset)
+
+    # ----------------------------------------
+    # Mutations
+    # ----------------------------------------
+
+    def _tally(self, order, sign):
+        """Add (sign=1) or remove (sign=-1) an order's contribution to the counters."""
+        counts = self.data["statusCounts"]
+        counts[order.status] = counts.get(order.status, 0) + sign
+
+        if order.status in OPEN_STATUSES:
+            if sign > 0:
+                self._active[order.id] = None
+            else:
+                self._active.pop(order.id, None)
+
+        stats = self.data["stats"]
+        stats["totalRevenue"] = round(stats.get("totalRevenue", 0) + sign * order.total, 2)
+        stats["totalProfit"] = round(stats.get("totalProfit", 0) + sign * order.profit, 2)
+
+    def _apply(self, record):
+        """Apply one journal record to the in-memory snapshot."""
+        op = record["op"]
+        stats = self.data["stats"]
+
+        if op == "add":
+            order = Order.from_dict(record["order"])
+            existing = self._orders.get(order.id)
+            if existing is not None:
+                self._tally(existing, -1)
+                self._orders[order.id] = order
+                self._tally(order, 1)
+            else:
+                self._orders[order.id] = order
+                stats["totalOrders"] = stats.get("totalOrders", 0) + 1
+                stats["lastOrder"] = order.created_at
+                self._tally(order, 1)
+
+        elif op == "update":
+            order = self._orders.get(record["id"])
+            if order is not None:
+                self._tally(order, -1)
+                order.update(record["fields"])
+                self._tally(order, 1)
+
+        elif op == "archive":
+            # Archived orders leave the snapshot but stay in the counters via "archived"
+            archived = self.data.setdefault("archived", {"orders": 0, "revenue": 0, "profit": 0, "statusCounts": {}})
+            for key in record["ids"]:
+                order = self._orders.pop(key, None)
+                if order is None:
+                    continue
+                archived["orders"] += 1
+                archived["revenue"] = round(archived["revenue"] + order.total, 2)
+                archived["profit"] = round(archived["profit"] + order.profit, 2)
+                archived["statusCounts"][order.status] = archived["statusCounts"].get(order.status, 0) + 1
+
+        total_orders = stats.get("totalOrders", 0)
+        stats["averageOrderValue"] = round(stats["totalRevenue"] / total_orders, 2) if total_orders else 0
+        self.data["lastUpdated"] = record["at"]
+
+    @contextmanager
+    def batch(self):
+        """Group commit: every change in the block is journaled with one write and fsync.
+
+        The write lock is held for the whole block. Changes are visible in
+        memory straight away but only reach disk when the block exits, so
+        sync an OrderRepository after the block, not inside it.
+        """
+        if self._batch is not None:
+            yield self  # Already inside a batch
+            return
+
+        with locked(self.snapshot_file):
+            self._catch_up()
+            self._batch = []
+            try:
+                yield self
+            finally:
+                records, self._batch = self._batch, None
+                self._write(records)
+
+    def _write(self, records):
+        """Durably append records to the journal; the caller holds the write lock."""
+        if records:
+            with open(self.journal_file, "a") as f:
+                f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+                f.flush()
+                os.fsync(f.fileno())
+                self._journal_offset = f.tell()
+
+        if self._pending >= self.compact_every:
+            self._compact()
+
+    def _append(self, record):
+        """Apply a record and queue it for the journal."""
+        if self._batch is None:
+            with self.batch():
+                return self._append(record)
+
+        self._seq += 1
+        record["seq"] = self._seq
+        record["at"] = datetime.now().isoformat()
+        self._apply(record)
+        self._pending += 1
+        self._batch.append(record)
+
+    def add(self, order):
+        """Record a new order (an Order or a dict in any order shape)."""
+        if isinstance(order, dict):
+            order = Order.from_dict(order)
+        self._append({"op": "add", "order": order.to_dict()})
+        return self._orders[order.id]
+
+    def update(self, order_id, **fields):
+        """Record a change to an existing order's fields."""
+        self._append({"op": "update", "id": order_id, "fields": fields})
+        return self._orders.get(order_id)
+
+    def archive(self, order_ids):
+        """Drop orders that have been copied to an archive partition."""
+        if order_ids:
+            self._append({"op": "archive", "ids": list(order_ids)})
+
+    def compact(self):
+        """Fold the journal into a fresh orders.json snapshot."""
+        with locked(self.snapshot_file):
+            self._catch_up()
+            self._compact()
+
+    def _compact(self):
+        self.data.pop("journalSeq", None)
+        self.data["activeOrderIds"] = list(self._active)
+        self.data["journalSeq"] = self._seq  # Last key: the webhook reads it from the file's tail
+        snapshot = {"orders": [o.to_dict() for o in self._orders.values()], **self.data}
+        atomic_write_json(self.snapshot_file, snapshot, self.indent)
+
+        # Records up to journalSeq are now in the snapshot; a crash before this
+        # truncate is harmless because load() skips them.
+        if self.journal_file.exists():
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(0)
+        self._snapshot_version = file_version(self.snapshot_file)
+        self._journal_offset = 0
+        self._pending = 0
+
+    # ----------------------------------------
+    # Reads
+    # ----------------------------------------
+
+    @property
+    def orders(self):
+        """All orders not yet archived, in insertion order."""
+        return self._orders.values()
+
+    @property
+    def stats(self):
+        """Running totals kept alongside the orders."""
+        return self.data["stats"]
+
+    def get(self, order_id):
+        """Look up an order by ID."""
+        return self._orders.get(order_id)
+
+    @property
+    def seq(self):
+        """Sequence number of the last applied journal record."""
+        return self._seq
+
+    @property
+    def base_seq(self):
+        """Sequence number already folded into the snapshot."""
+        return self.data.get("journalSeq", 0)
+
+    def journal_since(self, seq):
+        """Yield journal records newer than seq, up to what this store has applied."""
+        for record, _ in self._read_journal():
+            if record["seq"] > self._seq:
+                break
+            if record["seq"] > seq:
+                yield record
+
+    @property
+    def status_counts(self):
+        """Orders per status, kept current on every transition."""
+        return self.data["statusCounts"]
+
+    def active_orders(self):
+        """Orders in an open status, without scanning closed ones."""
+        return [self._orders[key] for key in list(self._active)]
+
+    # ----------------------------------------
+    # Counter maintenance
+    # ----------------------------------------
+
+    def recount(self):
+        """Recompute stats, statusCounts and the active index from the orders themselves."""
+        archived = self.data.get("archived", {})
+        counts = {status: 0 for status in empty_snapshot()["statusCounts"]}
+        for status, count in archived.get("statusCounts", {}).items():
+            counts[status] = counts.get(status, 0) + count
+        active = {}
+        revenue = archived.get("revenue", 0)
+        profit = archived.get("profit", 0)
+        for order in self._orders.values():
+            counts[order.status] = counts.get(order.status, 0) + 1
+            if order.status in OPEN_STATUSES:
+                active[order.id] = None
+            revenue += order.total
+            profit += order.profit
+
+        total_orders = len(self._orders) + archived.get("orders", 0)
+        stats = {
+            "totalOrders": total_orders,
+            "totalRevenue": round(revenue, 2),
+            "totalProfit": round(profit, 2),
+            "averageOrderValue": round(revenue / total_orders, 2) if total_orders else 0,
+        }
+        return stats, counts, active
+
+    def _counters_match(self):
+        """Cheap check that the counters describe the orders actually loaded."""
+        archived = self.data.get("archived", {}).get("orders", 0)
+        return self.data["stats"].get("totalOrders", 0) == len(self._orders) + archived
+
+    def _set_counters(self, stats, counts, active):
+        self.data["stats"].update(stats)
+        self.data["statusCounts"] = counts
+        self._active = active
+        self.data["countersVersion"] = COUNTERS_VERSION
+
+    def verify(self):
+        """Compare the running counters with a full recount; returns drift messages."""
+        stats, counts, active = self.recount()
+        drift = []
+
+        for key, expected in stats.items():
+            actual = self.data["stats"].get(key, 0)
+            if round(actual, 2) != round(expected, 2):
+                drift.append(f"stats.{key}: {actual} (expected {expected})")
+
+        for status in sorted(set(counts) | set(self.status_counts), key=str):
+            actual = self.status_counts.get(status, 0)
+            expected = counts.get(status, 0)
+            if actual != expected:
+                drift.append(f"statusCounts.{status}: {actual} (expected {expected})")
+
+        missing = set(active) - set(self._active)
+        stale = set(self._active) - set(active)
+        if missing:
+            drift.append(f"activeOrderIds: {len(missing)} open orders missing")
+        if stale:
+            drift.append(f"activeOrderIds: {len(stale)} closed orders still listed")
+
+        return drift
+
+    def rebuild(self):
+        """Reset the counters and active index from a full recount and save them."""
+        with locked(self.snapshot_file):
+            self._catch_up()
+            self._set_counters(*self.recount())
+            self._compact()
+
+
+def main():
+    """Command line entry point."""
+    task = sys.argv[1] if len(sys.argv) > 1 else "info"
+    store = OrderStore(pretty="--compact" not in sys.argv)
+
+    if task == "compact":
+        store.compact()
+        print(f"Compacted {len(store.orders)} orders into {store.snapshot_file}")
+    elif task == "info":
+        print(f"Orders: {len(store.orders)}")
+        print(f"Journal records pending compaction: {store._pending}")
+    elif task == "verify":
+        drift = store.verify()
+        if drift:
+            print("Counter drift found:")
+            for line in drift:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"Counters match {store.stats['totalOrders']} orders")
+    elif task == "rebuild":
+        store.rebuild()
+        print(f"Rebuilt counters for {store.stats['totalOrders']} orders")
+    else:
+        print(f"Unknown task: {task}")
+        print("Usage: python order_store.py [compact|info|verify|rebuild]")
+
+
+if __name__ == "__main__":
+    main()
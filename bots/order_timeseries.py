@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Order Time Series
+Hour, day and week buckets of order totals with O(1) window queries.
+
+Orders (or the repository's daily rollups) are bucketed once per grain into
+dense lists of order count, revenue and profit, and each list gets a prefix
+sum. Any window's totals are then two lookups per metric, whatever its
+length, so the dashboard can show 7, 30, 90 and 365-day views, each compared
+with the period before it, without another pass over the orders.
+
+Usage:
+    python order_timeseries.py                # Last 7/30/90/365 days vs the period before
+    python order_timeseries.py --grain hour --last 24
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from order_archive import load_orders
+
+GRAINS = ("hour", "day", "week")
+
+STEPS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+METRICS = ("orders", "revenue", "profit")
+
+
+def bucket_start(when, grain):
+    """Start of the hour, day or (Monday-based) week containing when."""
+    if grain == "hour":
+        return when.replace(minute=0, second=0, microsecond=0)
+    day = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def parse_time(timestamp):
+    """Naive datetime from an ISO date or timestamp."""
+    return datetime.fromisoformat(timestamp).replace(tzinfo=None)
+
+
+class TimeSeries:
+    """Dense per-bucket totals for one grain, with prefix sums."""
+
+    def __init__(self, grain, buckets):
+        self.grain = grain
+        self.step = STEPS[grain]
+        self.origin = min(buckets) if buckets else bucket_start(datetime.now(), grain)
+        size = (max(buckets) - self.origin) // self.step + 1 if buckets else 0
+
+        self.values = {m: [0] * size for m in METRICS}
+        for start, totals in buckets.items():
+            i = (start - self.origin) // self.step
+            for m, value in zip(METRICS, totals):
+                self.values[m][i] = value
+        self.prefix = {m: [0, *accumulate(values)] for m, values in self.values.items()}
+
+    def __len__(self):
+        return len(self.values["orders"])
+
+    def _index(self, when):
+        """Prefix position of the bucket containing when, clamped to the data."""
+        i = (bucket_start(when, self.grain) - self.origin) // self.step
+        return min(max(i, 0), len(self))
+
+    def last(self, n, now=None):
+        """(start, end) covering the last n buckets, the current one included."""
+        end = bucket_start(now or datetime.now(), self.grain) + self.step
+        return end - n * self.step, end
+
+    # ----------------------------------------
+    # Window queries
+    # ----------------------------------------
+
+    def totals(self, start, end):
+        """Orders, revenue, profit and AOV for buckets in [start, end)."""
+        i, j = self._index(start), self._index(end)
+        orders, revenue, profit = (self.prefix[m][j] - self.prefix[m][i] for m in METRICS)
+        return {
+            "orders": orders,
+            "revenue": round(revenue, 2),
+            "profit": round(profit, 2),
+            "aov": round(revenue / orders, 2) if orders else 0,
+        }
+
+    def compare(self, start, end):
+        """Totals for [start, end) and the equally long period before it, with % change."""
+        current = self.totals(start, end)
+        previous = self.totals(start - (end - start), start)
+        change = {}
+        for key, value in current.items():
+            before = previous[key]
+            change[key] = round((value - before) / before * 100, 1) if before else None
+        return {"current": current, "previous": previous, "change": change}
+
+    def series(self, start, end, metric="revenue"):
+        """[(bucket start, value)] for every bucket in [start, end), zeros included."""
+        points = []
+        when = bucket_start(start, self.grain)
+        while when < end:
+            i = (when - self.origin) // self.step
+            value = self.values[metric][i] if 0 <= i < len(self) else 0
+            points.append((when, round(value, 2)))
+            when += self.step
+        return points
+
+
+class SeriesBuilder:
+    """Accumulates buckets for several grains in one pass, then builds TimeSeries."""
+
+    def __init__(self, grains=GRAINS):
+        self.buckets = {grain: {} for grain in grains}
+
+    def add(self, when, orders, revenue, profit):
+        """Fold totals at a point in time into every grain."""
+        for grain, buckets in self.buckets.items():
+            totals = buckets.setdefault(bucket_start(when, grain), [0, 0.0, 0.0])
+            totals[0] += orders
+            totals[1] += revenue
+            totals[2] += profit
+
+    def add_order(self, order):
+        """Fold one Order."""
+        self.add(parse_time(order.created_at), 1, order.revenue, order.profit)
+
+    def build(self):
+        """{grain: TimeSeries}."""
+        return {grain: TimeSeries(grain, buckets) for grain, buckets in self.buckets.items()}
+
+
+def build_series(orders, grains=GRAINS):
+    """TimeSeries per grain from an iterable of Orders."""
+    builder = SeriesBuilder(grains)
+    for order in orders:
+        builder.add_order(order)
+    return builder.build()
+
+
+def series_from_rollups(rows):
+    """Day and week TimeSeries from OrderRepository.rollups() rows."""
+    builder = SeriesBuilder(("day", "week"))
+    for row in rows:
+        builder.add(parse_time(row["day"]), row["orders"], row["revenue"], row["profit"])
+    return builder.build()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Order totals over time windows')
+    parser.add_argument('--grain', '-g', choices=GRAINS, default='day', help='Bucket size')
+    parser.add_argument('--last', '-n', type=int, action='append', help='Window length in buckets (repeatable)')
+
+    args = parser.parse_args()
+
+    ts = build_series(load_orders(), (args.grain,))[args.grain]
+    for n in args.last or [7, 30, 90, 365]:
+        result = ts.compare(*ts.last(n))
+        current, change = result["current"], result["change"]
+        trend = f"{change['revenue']:+.1f}%" if change["revenue"] is not None else "n/a"
+        print(f"Last {n} {args.grain}s: {current['orders']} orders, ${current['revenue']:,.2f} revenue "
+              f"({trend}), ${current['profit']:,.2f} profit, ${current['aov']:.2f} AOV")
+
+
+if __name__ == "__main__":
+    main()
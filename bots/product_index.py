@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Product Index
+Set of allocated product IDs and slugs, saved next to products.json.
+
+Product IDs are slugs of the product name. ProductIndex keeps every ID ever
+handed out in a set, plus the next free numeric suffix per slug, so
+allocate() finds a unique ID in O(1) however many products share a name:
+"sunset-lamp", then "sunset-lamp-2", "sunset-lamp-3", ... IDs of removed
+products stay in the index and are never reused, so old orders keep
+pointing at the product they were placed for.
+
+The index is written under the products.json lock by whoever changes the
+catalog, and stamped with the catalog's lastUpdated value and size. If
+products.json was changed without it (by hand, or by an older bot), the
+stamp no longer matches and the IDs are merged back in from the catalog.
+
+Usage:
+    python product_index.py             # Index stats
+    python product_index.py --rebuild   # Re-read the catalog into the index
+"""
+
+import argparse
+from pathlib import Path
+
+from data_access import Session, atomic_write_json, load_json, locked
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def slugify(name, max_length=30):
+    """URL-safe product slug of a name."""
+    base = name.lower().replace(" ", "-")
+    base = ''.join(c for c in base if c.isalnum() or c == '-')
+    return base[:max_length]
+
+
+def catalog_stamp(catalog):
+    """What the index records about the catalog it was last saved with."""
+    return [catalog.get("lastUpdated"), len(catalog.get("products", []))]
+
+
+class ProductIndex:
+    """Allocated product IDs and per-slug suffix counters."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else DATA_DIR / "product_index.json"
+        self.ids = set()
+        self.slugs = {}
+        self.stamp = None
+
+    def load(self):
+        """Read the saved index; returns self."""
+        data, _ = load_json(self.path, {})
+        data = data or {}
+        self.ids = set(data.get("ids", []))
+        self.slugs = data.get("slugs", {})
+        self.stamp = data.get("stamp")
+        return self
+
+    def save(self, indent=None):
+        """Write the index. Callers hold the products.json lock."""
+        data = {"stamp": self.stamp, "ids": sorted(self.ids), "slugs": self.slugs}
+        with locked(self.path):
+            atomic_write_json(self.path, data, indent)
+
+    # ----------------------------------------
+    # Catalog sync
+    # ----------------------------------------
+
+    def sync(self, catalog, force=False):
+        """Make sure every ID in the catalog is known; cheap when the stamp matches.
+
+        Returns True if the catalog had to be read.
+        """
+        stamp = catalog_stamp(catalog)
+        if self.stamp == stamp and not force:
+            return False
+        self.load()
+        if self.stamp == stamp and not force:
+            return False
+        self.ids.update(p["id"] for p in catalog.get("products", []) if p.get("id"))
+        self.stamp = stamp
+        return True
+
+    def mark_saved(self, last_updated, count):
+        """Record the catalog state (lastUpdated, product count) the index now matches."""
+        self.stamp = [last_updated, count]
+
+    # ----------------------------------------
+    # Allocation
+    # ----------------------------------------
+
+    def __contains__(self, product_id):
+        return product_id in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, product_id):
+        """Record an ID allocated elsewhere."""
+        self.ids.add(product_id)
+
+    def allocate(self, name):
+        """A new, never-used ID for a product name."""
+        slug = slugify(name)
+        if slug not in self.ids:
+            product_id = slug
+        else:
+            n = self.slugs.get(slug, 2)
+            while f"{slug}-{n}" in self.ids:
+                n += 1
+            product_id = f"{slug}-{n}"
+            self.slugs[slug] = n + 1
+        self.ids.add(product_id)
+        return product_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SellBuddy product ID index')
+    parser.add_argument('--rebuild', action='store_true', help='Merge the IDs in products.json into the index')
+
+    args = parser.parse_args()
+
+    index = ProductIndex().load()
+    if args.rebuild:
+        with Session() as session:
+            catalog = session.load(DATA_DIR / "products.json", dict) or {}
+            index.sync(catalog, force=True)
+            index.save()
+    print(f"IDs: {len(index.ids)} | Slugs with suffixes: {len(index.slugs)}")
+
+
+if __name__ == "__main__":
+    main()
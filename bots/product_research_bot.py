@@ -7,10 +7,17 @@ Generates daily HTML reports with top product recommendations.
 
 import json
 import os
+import argparse
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from data_access import write_text_if_changed
+from html_templates import render
+from report_index import index_report
+from product_scoring import DEFAULT_WEIGHTS, ProductTable, parse_weights, rank
+from score_cache import ScoreCache
+
 # Simulated trending data (in production, integrate with actual APIs)
 TRENDING_NICHES = {
     "smart_home": {
@@ -70,33 +77,18 @@ PRODUCT_DATABASE = [
 ]
 
 
-def calculate_score(product):
-    """Calculate overall product score based on multiple factors."""
-    margin = (product["retail"] - product["cost"]) / product["retail"] * 100
-    niche_growth = TRENDING_NICHES.get(product["niche"], {}).get("growth", 20)
-
-    # Weighted scoring
-    score = (
-        product["viral_score"] * 0.4 +  # Viral potential
-        margin * 0.3 +                   # Profit margin
-        niche_growth * 0.3               # Market growth
-    )
-    return round(score, 1)
-
+def get_trending_products(limit=10, feed=None, weights=None, cache=None):
+    """Get top trending products, best score first.
 
-def get_trending_products(limit=10):
-    """Get top trending products sorted by score."""
-    products = []
-    for p in PRODUCT_DATABASE:
-        product = p.copy()
-        product["score"] = calculate_score(product)
-        product["margin"] = round((p["retail"] - p["cost"]) / p["retail"] * 100, 1)
-        product["profit"] = p["retail"] - p["cost"]
-        product["niche_growth"] = TRENDING_NICHES.get(p["niche"], {}).get("growth", 20)
-        products.append(product)
-
-    products.sort(key=lambda x: x["score"], reverse=True)
-    return products[:limit]
+    Candidates come from PRODUCT_DATABASE, or from a supplier feed CSV, and
+    are scored as one batch by product_scoring. With a ScoreCache, rows
+    whose inputs were scored before reuse their saved score and only the
+    rest are scored.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    table = ProductTable.from_csv(feed) if feed else ProductTable.from_records(PRODUCT_DATABASE)
+    scores = cache.scores(table, TRENDING_NICHES, weights) if cache is not None else None
+    return rank(table, TRENDING_NICHES, limit, weights, scores)
 
 
 def get_niche_analysis():
@@ -143,76 +135,7 @@ def generate_html_report(products, niches):
         </div>
         """
 
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>SellBuddy - Daily Product Research Report</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Segoe UI', sans-serif; background: #f5f5f5; padding: 20px; }}
-        .container {{ max-width: 1200px; margin: 0 auto; }}
-        header {{ background: linear-gradient(135deg, #6366f1, #4f46e5); color: white; padding: 30px; border-radius: 12px; margin-bottom: 30px; }}
-        header h1 {{ margin-bottom: 10px; }}
-        header p {{ opacity: 0.9; }}
-        .card {{ background: white; border-radius: 12px; padding: 25px; margin-bottom: 25px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        h2 {{ color: #1f2937; margin-bottom: 20px; }}
-        table {{ width: 100%; border-collapse: collapse; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #e5e7eb; }}
-        th {{ background: #f9fafb; font-weight: 600; }}
-        .score {{ background: #6366f1; color: white; padding: 4px 12px; border-radius: 20px; font-weight: 600; }}
-        .niches-grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(250px, 1fr)); gap: 20px; }}
-        .niche-card {{ background: #f9fafb; padding: 20px; border-radius: 8px; border-left: 4px solid #6366f1; }}
-        .niche-card h3 {{ color: #4f46e5; margin-bottom: 10px; }}
-        .growth {{ color: #10b981; font-weight: 600; font-size: 1.2em; }}
-        .keywords {{ color: #6b7280; font-size: 0.9em; margin-top: 10px; }}
-        footer {{ text-align: center; color: #6b7280; margin-top: 30px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>Daily Product Research Report</h1>
-            <p>Generated on {today} | SellBuddy Automation</p>
-        </header>
-
-        <div class="card">
-            <h2>Top 10 Trending Products</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>#</th>
-                        <th>Product</th>
-                        <th>Niche</th>
-                        <th>Cost</th>
-                        <th>Retail</th>
-                        <th>Margin</th>
-                        <th>Viral Score</th>
-                        <th>Overall Score</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {products_html}
-                </tbody>
-            </table>
-        </div>
-
-        <div class="card">
-            <h2>Niche Analysis</h2>
-            <div class="niches-grid">
-                {niches_html}
-            </div>
-        </div>
-
-        <footer>
-            <p>SellBuddy Product Research Bot v1.0 | Data refreshed daily at 8:00 AM UTC</p>
-        </footer>
-    </div>
-</body>
-</html>"""
-
-    return html
+    return render("research_report", today=today, products_html=products_html, niches_html=niches_html)
 
 
 def save_report(html_content):
@@ -222,21 +145,27 @@ def save_report(html_content):
 
     # Save daily report
     report_path = reports_dir / "daily_report.html"
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    changed = write_text_if_changed(report_path, html_content)
 
     # Also save dated backup
     date_str = datetime.now().strftime("%Y-%m-%d")
     backup_path = reports_dir / f"report_{date_str}.html"
-    with open(backup_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    changed |= write_text_if_changed(backup_path, html_content)
+    index_report(backup_path)
 
-    print(f"Report saved to: {report_path}")
+    print(f"Report {'saved to' if changed else 'unchanged'}: {report_path}")
     return str(report_path)
 
 
 def main():
     """Main function to run product research."""
+    parser = argparse.ArgumentParser(description='SellBuddy product research')
+    parser.add_argument('--feed', '-f', help='Supplier feed CSV to score instead of the built-in product list')
+    parser.add_argument('--weights', '-w', help='Score weights, e.g. viral=0.5,margin=0.3,growth=0.2')
+    parser.add_argument('--cache', action='store_true', help='Reuse per-product scores saved in data/score_cache.json')
+
+    args = parser.parse_args()
+
     print("=" * 50)
     print("SellBuddy Product Research Bot")
     print("=" * 50)
@@ -245,7 +174,11 @@ def main():
 
     # Get trending products
     print("Analyzing trending products...")
-    products = get_trending_products(10)
+    cache = ScoreCache().load() if args.cache else None
+    products = get_trending_products(10, args.feed, parse_weights(args.weights), cache)
+    if cache is not None:
+        cache.save()
+        print(f"Scores: {cache.hits} cached, {cache.misses} computed")
 
     print("\nTop 5 Products:")
     for i, p in enumerate(products[:5], 1):
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Quantile Sketch
+Mergeable streaming quantiles (KLL sketch) in pure Python.
+
+A KLL sketch keeps a few hundred values no matter how many it has seen:
+level h holds samples that each stand for 2^h originals, and a full level
+is sorted and every other value promoted to the next one. Rank error stays
+around 1-2% with the default k=200, and two sketches merge by concatenating
+their levels, so per-day sketches roll up into any window without going
+back to the orders. Compaction alternates which half it keeps instead of
+flipping a coin, so the same input always gives the same sketch.
+
+Usage:
+    python quantile_sketch.py 12.5 30 41.99 ...   # p50/p90/p99 of the given numbers
+"""
+
+import sys
+
+DEFAULT_K = 200
+
+# Each level below the top holds this fraction of the one above it
+_SHRINK = 2 / 3
+
+
+class KLLSketch:
+    """Streaming quantile sketch with bounded memory."""
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.n = 0
+        self.min = None
+        self.max = None
+        self.levels = [[]]
+        self._flip = 0
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(self.k * _SHRINK ** depth))
+
+    def _size(self):
+        return sum(len(items) for items in self.levels)
+
+    def _max_size(self):
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _compress(self):
+        """Compact the lowest full level until the sketch fits again."""
+        while self._size() >= self._max_size():
+            for h, items in enumerate(self.levels):
+                if len(items) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append([])
+                    items.sort()
+                    self.levels[h + 1].extend(items[self._flip::2])
+                    self._flip ^= 1
+                    items.clear()
+                    break
+
+    # ----------------------------------------
+    # Updates
+    # ----------------------------------------
+
+    def update(self, value):
+        """Add one value."""
+        self.n += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.levels[0].append(value)
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other):
+        """Fold another sketch into this one; returns self."""
+        if not other.n:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    # ----------------------------------------
+    # Queries
+    # ----------------------------------------
+
+    def quantile(self, q):
+        """Approximate value at rank q (0..1); None for an empty sketch."""
+        if not self.n:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        weighted = sorted((x, 1 << h) for h, items in enumerate(self.levels) for x in items)
+        total = sum(w for _, w in weighted)
+        target = q * total
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return value
+        return self.max
+
+    def quantiles(self, qs=(0.5, 0.9, 0.99)):
+        """{"p50": ..., "p90": ..., "p99": ...} for the given ranks."""
+        return {f"p{round(q * 100):g}": self.quantile(q) for q in qs}
+
+    def to_dict(self):
+        """JSON-serializable form."""
+        return {"k": self.k, "n": self.n, "min": self.min, "max": self.max,
+                "flip": self._flip, "levels": self.levels}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a sketch saved with to_dict()."""
+        sketch = cls(data.get("k", DEFAULT_K))
+        sketch.n = data["n"]
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        sketch._flip = data.get("flip", 0)
+        sketch.levels = [list(items) for items in data["levels"]] or [[]]
+        return sketch
+
+
+def margin_pct(order):
+    """Order margin in percent, or None when the order has no total or no known cost."""
+    if not order.total or order.cost is None:
+        return None
+    return round(order.profit / order.total * 100, 2)
+
+
+def main():
+    sketch = KLLSketch()
+    for arg in sys.argv[1:]:
+        sketch.update(float(arg))
+    for name, value in sketch.quantiles().items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
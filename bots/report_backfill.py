@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Report Backfill
+Fills in missing daily_report_<date>.json files for a range of past days.
+
+Days the daily run missed are rebuilt from the order and product history.
+Days that already have a report are never rewritten: a recorded report
+holds the prices and catalog of its day, which the history cannot
+reproduce. Each missing day is one task on a process pool; every worker
+loads the history once, and a day's report only depends on that history,
+so reruns give byte-identical files.
+
+A checkpoint (data/backfill_checkpoint.json) records finished days. If a run
+dies or some days fail, running the same command again skips the days
+already done; the checkpoint is removed once the whole range succeeds.
+
+History is reconstructed as well as the data allows: orders count from their
+creation date and move to processing/shipped on their processed_at/shipped_at
+dates; products count from their addedAt date at today's prices, since price
+changes and removals are not recorded. Backfilled reports are marked
+"backfilled": true for that reason.
+
+--regenerate works on the existing reports instead: each keeps its recorded
+product summary, order stats and content count, and only the sections
+derived from them (the recommendations) are rebuilt, on the same pool and
+with its own checkpoint. The inputs are read from the report itself, so
+the output is as deterministic as a backfill.
+
+Usage:
+    python report_backfill.py 2026-01-01 2026-03-31              # Fill the gaps in a range
+    python report_backfill.py 2026-01-01 2026-03-31 --workers 8
+    python report_backfill.py 2026-01-01 2026-03-31 --force      # Ignore the checkpoint
+    python report_backfill.py 2026-01-01 2026-03-31 --regenerate # Rebuild recommendations of existing reports
+"""
+
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+
+from autonomous_controller import CONFIG, AutonomousAnalytics
+from data_access import atomic_write_json, load_json
+from order_archive import load_orders
+from order_store import OPEN_STATUSES
+from report_index import ReportIndex
+
+CHECKPOINT_FILE = CONFIG["data_dir"] / "backfill_checkpoint.json"
+
+# Per-worker history, loaded once by _init_worker
+_history = {}
+
+
+def days_between(start, end):
+    """ISO dates from start to end inclusive."""
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+
+def status_on(order, day):
+    """Best reconstruction of an order's status at the end of a day."""
+    if order.shipped_at and order.shipped_at[:10] <= day:
+        return "shipped"
+    if order.processed_at and order.processed_at[:10] <= day:
+        return "processing"
+    if order.status in OPEN_STATUSES or order.processed_at or order.shipped_at:
+        return "pending"
+    return order.status
+
+
+def order_stats_on(orders, day):
+    """The controller's order stats block as it would have read on a day."""
+    stats = {"total_orders": 0, "pending": 0, "processing": 0, "shipped": 0, "revenue": 0}
+    for order in orders:
+        if order.day > day:
+            continue
+        stats["total_orders"] += 1
+        stats["revenue"] += order.total
+        status = status_on(order, day)
+        if status in stats:
+            stats[status] += 1
+    stats["revenue"] = round(stats["revenue"], 2)
+    return stats
+
+
+def products_on(products, day):
+    """Products already added by the end of a day."""
+    return [p for p in products if (p.get("addedAt") or "")[:10] <= day]
+
+
+def content_count_on(content_dir, day):
+    """Number of content pieces generated that day."""
+    try:
+        with open(content_dir / f"content_{day}.json", "r") as f:
+            return len(json.load(f))
+    except (OSError, ValueError):
+        return 0
+
+
+def _init_worker(data_dir, history=True):
+    _history["analytics"] = AutonomousAnalytics()
+    if not history:
+        return
+    catalog, _ = load_json(data_dir / "products.json")
+    _history["products"] = (catalog or {}).get("products", [])
+    # Creation order keeps the float revenue sums identical across runs
+    _history["orders"] = sorted(load_orders(data_dir), key=lambda o: (o.created_at, o.id))
+
+
+def report_path(day):
+    """Path of a day's daily report."""
+    return CONFIG["reports_dir"] / f"daily_report_{day}.json"
+
+
+def backfill_day(day):
+    """Build one missing day's report; returns the day, or None if a report already exists."""
+    if report_path(day).exists():
+        return None
+    analytics = _history["analytics"]
+    report = analytics.build_report(
+        day,
+        products_on(_history["products"], day),
+        order_stats_on(_history["orders"], day),
+        content_count_on(CONFIG["content_dir"], day),
+        generated_at=f"{day}T23:59:59",
+    )
+    report["backfilled"] = True
+    analytics.save_report(report, index=False)  # The parent indexes once at the end
+    return day
+
+
+def regenerate_day(day):
+    """Rebuild the derived sections of a day's report; returns the day, or None if it has no report."""
+    report, _ = load_json(report_path(day))
+    if report is None:
+        return None
+    analytics = _history["analytics"]
+    report["recommendations"] = analytics.recommendations(report["products"], report["orders"])
+    analytics.save_report(report, index=False)
+    return day
+
+
+def backfill(start, end, workers=None, force=False, regenerate=False):
+    """Build the missing reports in [start, end]; returns (rebuilt, kept, failed) days.
+
+    With regenerate the existing reports are rebuilt instead, and kept lists
+    the days that have no report.
+    """
+    days = days_between(start, end)
+    kept = [d for d in days if report_path(d).exists() != regenerate]
+    mode = "regenerate" if regenerate else "backfill"
+
+    checkpoint = {"start": start, "end": end, "mode": mode, "done": []}
+    if not force and CHECKPOINT_FILE.exists():
+        with open(CHECKPOINT_FILE, "r") as f:
+            saved = json.load(f)
+        if (saved.get("start"), saved.get("end"), saved.get("mode", "backfill")) == (start, end, mode):
+            checkpoint = saved
+    done = set(checkpoint["done"])
+    todo = [d for d in days if d not in done and d not in kept]
+
+    task = regenerate_day if regenerate else backfill_day
+    rebuilt, failed = [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(CONFIG["data_dir"], not regenerate)) as pool:
+        futures = {pool.submit(task, day): day for day in todo}
+        for future in as_completed(futures):
+            day = futures[future]
+            try:
+                written = future.result()
+            except BrokenProcessPool:
+                raise  # A worker died outright; finished days stay in the checkpoint
+            except Exception as e:
+                print(f"  ✗ {day}: {e}")
+                failed.append(day)
+                continue
+            if written is None:
+                kept.append(day)  # Report written (or removed) since the range was listed
+                continue
+            rebuilt.append(day)
+            checkpoint["done"] = sorted(done.union(rebuilt))
+            atomic_write_json(CHECKPOINT_FILE, checkpoint)
+
+    if rebuilt:
+        index = ReportIndex(reports_dir=CONFIG["reports_dir"])
+        index.update([report_path(d) for d in sorted(rebuilt)])
+        index.close()
+
+    if not failed and CHECKPOINT_FILE.exists():
+        os.unlink(CHECKPOINT_FILE)
+    return sorted(rebuilt), sorted(kept), sorted(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill in missing SellBuddy daily reports for past days')
+    parser.add_argument('start', help='First day (YYYY-MM-DD)')
+    parser.add_argument('end', help='Last day (YYYY-MM-DD)')
+    parser.add_argument('--workers', '-w', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', '-f', action='store_true', help='Ignore the checkpoint (existing reports are still never rewritten)')
+    parser.add_argument('--regenerate', '-r', action='store_true',
+                        help='Rebuild the recommendations of existing reports from their recorded inputs')
+
+    args = parser.parse_args()
+
+    rebuilt, kept, failed = backfill(args.start, args.end, args.workers, args.force, args.regenerate)
+    if args.regenerate:
+        print(f"Regenerated {len(rebuilt)} daily reports; {len(kept)} days have no report")
+    else:
+        print(f"Backfilled {len(rebuilt)} missing daily reports; kept {len(kept)} existing ones unchanged")
+    if failed:
+        print(f"{len(failed)} days failed; run the same command again to retry them")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Report Index
+One indexed SQLite store (data/reports.db) over everything in reports/.
+
+Every daily_report_<date>.json is flattened into (date, metric, value) rows,
+so "products.avg_price" or "orders.revenue" over any date range is one
+indexed query. Product research reports (report_<date>.html) contribute
+their ranked product table plus research.* summary metrics. Files are
+re-read only when their size or mtime changes, so indexing after each new
+report costs one file, not the whole directory.
+
+Usage:
+    python report_index.py build                                # Index new or changed reports
+    python report_index.py metrics                              # List indexed metric names
+    python report_index.py query products.avg_price --last 90   # Series plus min/avg/max
+    python report_index.py query orders.revenue --start 2026-01-01 --end 2026-01-31
+    python report_index.py product "Galaxy Star Projector"      # Research score history
+"""
+
+import re
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPORTS_DIR = Path(__file__).parent.parent / "reports"
+DB_PATH = Path(__file__).parent.parent / "data" / "reports.db"
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    date TEXT,
+    metric TEXT,
+    value REAL,
+    source TEXT,
+    PRIMARY KEY (metric, date)
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_source ON metrics (source);
+CREATE TABLE IF NOT EXISTS research_products (
+    date TEXT,
+    rank INTEGER,
+    name TEXT,
+    niche TEXT,
+    cost REAL,
+    retail REAL,
+    margin REAL,
+    viral_score REAL,
+    score REAL,
+    source TEXT,
+    PRIMARY KEY (date, rank)
+);
+CREATE INDEX IF NOT EXISTS idx_research_name ON research_products (name, date);
+"""
+
+DAILY_REPORT = re.compile(r"daily_report_(\d{4}-\d{2}-\d{2})\.json$")
+RESEARCH_REPORT = re.compile(r"report_(\d{4}-\d{2}-\d{2})\.html$")
+
+_ROW = re.compile(r"<tr>(.*?)</tr>", re.S)
+_CELL = re.compile(r"<td>(.*?)</td>", re.S)
+_TAG = re.compile(r"<[^>]+>")
+
+
+def flatten(data, prefix=""):
+    """Yield (dotted.path, number) for every numeric leaf of a JSON object."""
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten(value, path + ".")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+        elif isinstance(value, list):
+            yield path + ".count", len(value)
+
+
+def _number(text):
+    """Float from a table cell like '$12', '65.7%' or '92'."""
+    try:
+        return float(text.strip().lstrip("$").rstrip("%"))
+    except ValueError:
+        return None
+
+
+def parse_research_html(text):
+    """Ranked product rows from a product research report's table."""
+    body = text.split("<tbody>", 1)[-1].split("</tbody>", 1)[0]
+    products = []
+    for row in _ROW.findall(body):
+        cells = [_TAG.sub("", c).strip() for c in _CELL.findall(row)]
+        if len(cells) < 8:
+            continue
+        products.append({
+            "rank": int(_number(cells[0]) or len(products) + 1),
+            "name": cells[1],
+            "niche": cells[2],
+            "cost": _number(cells[3]),
+            "retail": _number(cells[4]),
+            "margin": _number(cells[5]),
+            "viral_score": _number(cells[6]),
+            "score": _number(cells[7]),
+        })
+    return products
+
+
+class ReportIndex:
+    """SQLite index of daily and research reports."""
+
+    def __init__(self, db_path=None, reports_dir=None):
+        self.db_path = Path(db_path) if db_path else DB_PATH
+        self.reports_dir = Path(reports_dir) if reports_dir else REPORTS_DIR
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript(
+                "DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS metrics; DROP TABLE IF EXISTS research_products;"
+            )
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    # ----------------------------------------
+    # Indexing
+    # ----------------------------------------
+
+    def _forget(self, name):
+        self.conn.execute("DELETE FROM metrics WHERE source = ?", (name,))
+        self.conn.execute("DELETE FROM research_products WHERE source = ?", (name,))
+        self.conn.execute("DELETE FROM files WHERE name = ?", (name,))
+
+    def _index_file(self, path):
+        """(Re)index one report file; returns False for files that are not reports."""
+        daily = DAILY_REPORT.search(path.name)
+        research = RESEARCH_REPORT.search(path.name)
+        if not daily and not research:
+            return False
+
+        self._forget(path.name)
+        if daily:
+            date = daily.group(1)
+            with open(path, "r") as f:
+                report = json.load(f)
+            rows = [(date, metric, value, path.name) for metric, value in flatten(report)]
+        else:
+            date = research.group(1)
+            with open(path, "r", encoding="utf-8") as f:
+                products = parse_research_html(f.read())
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO research_products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(date, p["rank"], p["name"], p["niche"], p["cost"], p["retail"], p["margin"],
+                  p["viral_score"], p["score"], path.name) for p in products]
+            )
+            scores = [p["score"] for p in products if p["score"] is not None]
+            margins = [p["margin"] for p in products if p["margin"] is not None]
+            rows = [(date, "research.products", len(products), path.name)]
+            if scores:
+                rows += [(date, "research.top_score", max(scores), path.name),
+                         (date, "research.avg_score", round(sum(scores) / len(scores), 2), path.name)]
+            if margins:
+                rows.append((date, "research.avg_margin", round(sum(margins) / len(margins), 2), path.name))
+
+        self.conn.executemany("INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?)", rows)
+        st = path.stat()
+        self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)", (path.name, st.st_mtime_ns, st.st_size))
+        return True
+
+    def update(self, paths=None):
+        """Index new or changed reports (all of reports/ by default); returns files indexed."""
+        known = {row["name"]: (row["mtime_ns"], row["size"]) for row in self.conn.execute("SELECT * FROM files")}
+        scan = paths is None
+        paths = [Path(p) for p in paths] if paths else sorted(self.reports_dir.glob("*"))
+
+        indexed = 0
+        with self.conn:
+            for path in paths:
+                st = path.stat()
+                if known.get(path.name) == (st.st_mtime_ns, st.st_size):
+                    continue
+                if self._index_file(path):
+                    indexed += 1
+
+            if scan:
+                present = {p.name for p in paths}
+                for name in known.keys() - present:
+                    self._forget(name)
+        return indexed
+
+    # ----------------------------------------
+    # Queries
+    # ----------------------------------------
+
+    def metric_names(self):
+        """Indexed metric names with how many days each covers."""
+        rows = self.conn.execute("SELECT metric, COUNT(*) AS days FROM metrics GROUP BY metric ORDER BY metric")
+        return {row["metric"]: row["days"] for row in rows}
+
+    def series(self, metric, start=None, end=None):
+        """[(date, value)] for a metric over dates in [start, end]."""
+        rows = self.conn.execute(
+            "SELECT date, value FROM metrics WHERE metric = ? AND date >= ? AND date <= ? ORDER BY date",
+            (metric, start or "", end or "~")
+        )
+        return [(row["date"], row["value"]) for row in rows]
+
+    def summary(self, metric, start=None, end=None):
+        """Count, min, avg, max, first and last value of a metric over [start, end]."""
+        row = self.conn.execute(
+            """SELECT COUNT(*) AS n, MIN(value) AS min, AVG(value) AS avg, MAX(value) AS max
+               FROM metrics WHERE metric = ? AND date >= ? AND date <= ?""",
+            (metric, start or "", end or "~")
+        ).fetchone()
+        result = dict(row)
+        if result["avg"] is not None:
+            result["avg"] = round(result["avg"], 2)
+        return result
+
+    def product_history(self, name, start=None, end=None):
+        """Research rank and score of a product per report date."""
+        rows = self.conn.execute(
+            """SELECT date, rank, score, margin FROM research_products
+               WHERE name = ? AND date >= ? AND date <= ? ORDER BY date""",
+            (name, start or "", end or "~")
+        )
+        return [dict(row) for row in rows]
+
+
+def index_report(path):
+    """Add one freshly written report to the index."""
+    index = ReportIndex(reports_dir=Path(path).parent)
+    index.update([path])
+    index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the SellBuddy report index')
+    parser.add_argument('task', choices=['build', 'metrics', 'query', 'product'], help='Task to run')
+    parser.add_argument('name', nargs='?', help='Metric (query) or product name (product)')
+    parser.add_argument('--last', '-n', type=int, help='Only the last N days')
+    parser.add_argument('--start', type=str, help='First date (YYYY-MM-DD)')
+    parser.add_argument('--end', type=str, help='Last date (YYYY-MM-DD)')
+
+    args = parser.parse_args()
+
+    start, end = args.start, args.end
+    if args.last:
+        start = (datetime.now() - timedelta(days=args.last - 1)).strftime("%Y-%m-%d")
+
+    index = ReportIndex()
+    began = time.perf_counter()
+
+    if args.task == "build":
+        count = index.update()
+        print(f"Indexed {count} new or changed reports into {index.db_path}")
+    elif args.task == "metrics":
+        for metric, days in index.metric_names().items():
+            print(f"{metric}: {days} days")
+    elif not args.name:
+        parser.error(f"{args.task} needs a name")
+    elif args.task == "query":
+        index.update()
+        for date, value in index.series(args.name, start, end):
+            print(f"{date}  {value:g}")
+        s = index.summary(args.name, start, end)
+        print(f"{s['n']} days | min {s['min']} | avg {s['avg']} | max {s['max']}")
+    else:
+        index.update()
+        for row in index.product_history(args.name, start, end):
+            print(f"{row['date']}  #{row['rank']}  score {row['score']}  margin {row['margin']}%")
+
+    print(f"({(time.perf_counter() - began) * 1000:.1f} ms)")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
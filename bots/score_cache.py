@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Score Cache
+Per-product research scores remembered between runs (data/score_cache.json).
+
+A product's score depends only on its cost, retail price, viral score and
+its niche's growth, plus the weights. Each cached entry is keyed by a
+content hash of those four inputs and a weights version (the weights and
+SCORE_VERSION, bumped whenever the score formula changes), and holds the
+score. ScoreCache.scores() looks every row of a ProductTable up, scores
+only the rows that miss as one batch, and returns a full score column for
+product_scoring.rank(). Rows with identical inputs are hashed once.
+
+Each entry records the day it was last used. On save, entries unused for
+max_age days are dropped, and past max_entries the least recently used go
+first.
+
+Usage:
+    python score_cache.py            # Cache stats
+    python score_cache.py --evict    # Drop stale entries now
+    python score_cache.py --clear    # Empty the cache
+"""
+
+import argparse
+from array import array
+from datetime import date, timedelta
+from pathlib import Path
+
+from columnar import np
+from data_access import atomic_write_json, content_hash, load_json, locked
+from product_scoring import DEFAULT_WEIGHTS, NUMERIC_COLUMNS, niche_growth, score
+
+CACHE_PATH = Path(__file__).parent.parent / "data" / "score_cache.json"
+
+# Bumped whenever product_scoring.score() computes differently; older entries stop matching
+SCORE_VERSION = 1
+
+
+def weights_version(weights):
+    """Version tag of a weights dict under the current score formula."""
+    return f"{SCORE_VERSION}:{content_hash(weights)[:12]}"
+
+
+class ScoreCache:
+    """Product scores keyed by their inputs and the weights version."""
+
+    def __init__(self, path=None, max_age=30, max_entries=100_000):
+        self.path = Path(path) if path else CACHE_PATH
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = self.misses = 0
+
+    def load(self):
+        """Read the saved cache; returns self."""
+        data, _ = load_json(self.path, {})
+        # Entries are [score, last used]; anything else is from an older cache layout
+        self.entries = {k: e for k, e in (data or {}).get("entries", {}).items() if isinstance(e, list)}
+        return self
+
+    def save(self):
+        """Evict stale entries, then write the cache."""
+        self.evict()
+        with locked(self.path):
+            atomic_write_json(self.path, {"entries": self.entries}, indent=None)
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ----------------------------------------
+    # Lookup
+    # ----------------------------------------
+
+    def key(self, version, cost, retail, viral_score, growth):
+        """Cache key of one product's score inputs."""
+        return content_hash([version, cost, retail, viral_score, growth])[:32]
+
+    def scores(self, table, trending, weights=None):
+        """Score column for every row of table, scoring only the rows not cached."""
+        weights = weights or DEFAULT_WEIGHTS
+        version = weights_version(weights)
+        growth_by_code = niche_growth(table.niches, trending)
+        today = date.today().isoformat()
+
+        cost, retail, viral = (table.columns[c].tolist() for c in NUMERIC_COLUMNS)
+        codes = table.niche_codes.tolist()
+        result = np.zeros(len(table)) if np is not None else array("d", bytes(8 * len(table)))
+
+        keys, seen, missing = [], {}, []
+        for i, inputs in enumerate(zip(cost, retail, viral, (growth_by_code[k] for k in codes))):
+            key = seen.get(inputs)
+            if key is None:
+                key = seen[inputs] = self.key(version, *inputs)
+            keys.append(key)
+            entry = self.entries.get(key)
+            if entry is None:
+                missing.append(i)
+                continue
+            result[i] = entry[0]
+            entry[1] = today
+
+        if missing:
+            for i, value in zip(missing, score(table, trending, weights, missing).tolist()):
+                result[i] = value
+                self.entries[keys[i]] = [value, today]
+        self.hits += len(table) - len(missing)
+        self.misses += len(missing)
+        return result
+
+    # ----------------------------------------
+    # Eviction
+    # ----------------------------------------
+
+    def evict(self):
+        """Drop entries unused for max_age days, then the least recently used past max_entries."""
+        cutoff = (date.today() - timedelta(days=self.max_age)).isoformat()
+        fresh = sorted(((k, e) for k, e in self.entries.items() if e[1] >= cutoff),
+                       key=lambda item: item[1][1], reverse=True)
+        removed = len(self.entries) - min(len(fresh), self.max_entries)
+        self.entries = dict(fresh[:self.max_entries])
+        return removed
+
+    def clear(self):
+        """Remove every entry."""
+        self.entries = {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SellBuddy score cache')
+    parser.add_argument('--evict', action='store_true', help='Drop stale entries now')
+    parser.add_argument('--clear', action='store_true', help='Remove every entry')
+    parser.add_argument('--max-age', type=int, default=30, help='Days an unused entry is kept')
+
+    args = parser.parse_args()
+
+    cache = ScoreCache(max_age=args.max_age).load()
+    if args.clear:
+        cache.clear()
+        cache.save()
+    elif args.evict:
+        print(f"Evicted: {cache.evict()}")
+        cache.save()
+    oldest = min((e[1] for e in cache.entries.values()), default=None)
+    print(f"Entries: {len(cache)}" + (f" | Oldest last used: {oldest}" if oldest else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Template Space
+Lazy enumeration of every product name the templates can produce.
+
+Each template in TRENDING_PRODUCT_TEMPLATES names its placeholders, e.g.
+"{adj} Posture {type}", and each placeholder draws from one value list of
+its category ("adj", or a plural like "types"). The names of one template
+are the cartesian product of those lists, so the whole space is a sum of
+products and every name has an index. name_at() decodes an index without
+building anything; iteration walks the space in order, and sample() walks
+it in a random order (a keyed Feistel permutation over the indexes) so
+names come out without replacement. unseen() skips names already taken.
+
+Usage:
+    python template_space.py              # Size of the space per template
+    python template_space.py --sample 10  # Ten random names, no repeats
+    python template_space.py --all        # Every name, in order
+"""
+
+import random
+import argparse
+from bisect import bisect_right
+from itertools import accumulate, islice, product
+from math import prod
+from string import Formatter
+
+
+def placeholder_values(category_data, field):
+    """Value list for a placeholder: the key itself or its plural."""
+    for key in (field, field + "s", field + "es"):
+        values = category_data.get(key)
+        if key not in ("category", "templates") and isinstance(values, list):
+            return values
+    raise KeyError(f"No values for {{{field}}} in {category_data.get('category')}")
+
+
+def placeholders(template):
+    """Placeholder names of a template, in order."""
+    return [f for _, f, _, _ in Formatter().parse(template["name"]) if f]
+
+
+def fill_name(template, category_data, rng=random):
+    """A random name from one template (repeats allowed)."""
+    fields = placeholders(template)
+    return template["name"].format(**{f: rng.choice(placeholder_values(category_data, f)) for f in fields})
+
+
+def permutation(n, rng=random):
+    """Yield range(n) in a random order without materializing it."""
+    if n <= 1:
+        yield from range(n)
+        return
+    bits = (n - 1).bit_length()
+    bits += bits % 2
+    half = bits // 2
+    mask = (1 << half) - 1
+    keys = [rng.getrandbits(32) for _ in range(4)]
+    for i in range(1 << bits):
+        left, right = i >> half, i & mask
+        for key in keys:
+            left, right = right, left ^ (hash((right, key)) & mask)
+        x = (left << half) | right
+        if x < n:  # Cycle-walk: the domain is at most 4n, so few values are skipped
+            yield x
+
+
+class TemplateSpace:
+    """Every (template, name) pair of a list of template categories, by index."""
+
+    def __init__(self, categories):
+        self.rows = []
+        for category_data in categories:
+            for template in category_data["templates"]:
+                fields = placeholders(template)
+                values = [placeholder_values(category_data, f) for f in fields]
+                self.rows.append((category_data, template, fields, values))
+        sizes = [prod(len(v) for v in values) for _, _, _, values in self.rows]
+        self.offsets = [0] + list(accumulate(sizes))
+
+    def __len__(self):
+        return self.offsets[-1]
+
+    def name_at(self, index):
+        """(row, name) for a global index; row indexes self.rows."""
+        row = bisect_right(self.offsets, index) - 1
+        _, template, fields, values = self.rows[row]
+        local = index - self.offsets[row]
+        chosen = {}
+        for field, options in zip(reversed(fields), reversed(values)):
+            local, pick = divmod(local, len(options))
+            chosen[field] = options[pick]
+        return row, template["name"].format(**chosen)
+
+    def __iter__(self):
+        """Every (row, name) in index order."""
+        for row, (_, template, fields, values) in enumerate(self.rows):
+            for combo in product(*values):
+                yield row, template["name"].format(**dict(zip(fields, combo)))
+
+    def sample(self, rng=random):
+        """Every (row, name) once, in a random order."""
+        for index in permutation(len(self), rng):
+            yield self.name_at(index)
+
+    def unseen(self, seen=(), rng=None):
+        """(row, name) pairs whose name is not in seen and not yielded before."""
+        taken = set(seen)
+        for row, name in (self.sample(rng) if rng else iter(self)):
+            if name not in taken:
+                taken.add(name)
+                yield row, name
+
+    def names(self, seen=(), rng=random):
+        """Endless (row, name) stream: unseen names first, then further random passes."""
+        if not len(self):
+            return
+        yield from self.unseen(seen, rng)
+        while True:
+            yield from self.sample(rng)
+
+
+def main():
+    from autonomous_controller import TRENDING_PRODUCT_TEMPLATES  # Which imports this module
+
+    parser = argparse.ArgumentParser(description='Enumerate product names from the templates')
+    parser.add_argument('--sample', '-s', type=int, help='Print this many random names, without repeats')
+    parser.add_argument('--all', '-a', action='store_true', help='Print every name in order')
+    parser.add_argument('--seed', type=int, help='Random seed for --sample')
+
+    args = parser.parse_args()
+
+    space = TemplateSpace(TRENDING_PRODUCT_TEMPLATES)
+    if args.sample:
+        for _, name in islice(space.unseen(rng=random.Random(args.seed)), args.sample):
+            print(name)
+    elif args.all:
+        for _, name in space.unseen():
+            print(name)
+    else:
+        for (category_data, template, _, _), start, end in zip(space.rows, space.offsets, space.offsets[1:]):
+            print(f"{category_data['category']:<20} {template['name']:<32} {end - start}")
+        print(f"Total: {len(space)} names")
+
+
+if __name__ == "__main__":
+    main()
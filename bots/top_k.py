@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+SellBuddy Top-K
+Leaders of a ranking without sorting everything.
+
+top_k() keeps a k-sized heap while it walks the items, so picking the best
+10 of a million products costs O(n log k) instead of a full sort. For
+streams with more distinct keys than fit in memory (products or customers
+across years of orders), SpaceSaving tracks the heavy hitters in a fixed
+number of counters: every key whose true total exceeds 1/capacity of the
+stream is guaranteed to be kept, and each count carries its maximum
+overestimate.
+
+Usage:
+    python top_k.py data/orders/*.jsonl --k 10    # Heaviest products by revenue
+"""
+
+import heapq
+import argparse
+from itertools import count as counter
+
+
+def top_k(items, k, key=None):
+    """The k largest items, best first (ties keep input order)."""
+    return heapq.nlargest(k, items, key=key)
+
+
+class SpaceSaving:
+    """Heavy hitters over a stream with at most capacity counters."""
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []  # (count, tiebreak, key) entries; stale ones are skipped on eviction
+        self._tiebreak = counter()
+
+    def add(self, key, weight=1):
+        """Count weight more for key."""
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+        elif len(counts) < self.capacity:
+            counts[key] = weight
+            self.errors[key] = 0
+        else:
+            # Replace the smallest counter; the newcomer inherits its count as error
+            while True:
+                count, _, victim = heapq.heappop(self._heap)
+                if counts.get(victim) == count:
+                    break
+            del counts[victim]
+            del self.errors[victim]
+            counts[key] = count + weight
+            self.errors[key] = count
+        heapq.heappush(self._heap, (counts[key], next(self._tiebreak), key))
+
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, next(self._tiebreak), k) for k, c in counts.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, k=10):
+        """[(key, count, max overestimate)] for the k heaviest keys."""
+        leaders = top_k(self.counts.items(), k, key=lambda item: item[1])
+        return [(key, count, self.errors[key]) for key, count in leaders]
+
+
+def main():
+    from order_metrics import stream_orders  # order_metrics imports this module
+
+    parser = argparse.ArgumentParser(description='Heaviest products by revenue, in one pass')
+    parser.add_argument('files', nargs='+', help='Order .jsonl or .csv files')
+    parser.add_argument('--k', type=int, default=10, help='How many leaders to show')
+    parser.add_argument('--capacity', type=int, default=1000, help='Counters to keep')
+
+    args = parser.parse_args()
+
+    sketch = SpaceSaving(args.capacity)
+    for path in args.files:
+        for order in stream_orders(path):
+            sketch.add(order.product or order.product_id, order.revenue)
+
+    for name, revenue, error in sketch.top(args.k):
+        bound = f" (±{error:,.2f})" if error else ""
+        print(f"{name}: ${revenue:,.2f}{bound}")
+
+
+if __name__ == "__main__":
+    main()